@@ -0,0 +1,88 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from main import BuildSession, add_build_arguments, check_backend_arguments
+
+if TYPE_CHECKING:
+    from show_orchestrator.batch import ShowResult
+
+
+def build_show(args: argparse.Namespace) -> "ShowResult":
+    from show_orchestrator.batch import ShowResult
+
+    start = time.perf_counter()
+    try:
+        args.output_dir.mkdir(parents=True, exist_ok=True)
+        BuildSession(args).build()
+    except Exception as error:
+        return ShowResult(
+            file=args.file,
+            output_dir=args.output_dir,
+            seconds=time.perf_counter() - start,
+            error=str(error) or type(error).__name__
+        )
+    return ShowResult(file=args.file, output_dir=args.output_dir, seconds=time.perf_counter() - start)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description=(
+            "Build many show definitions in one process pool.\n"
+            "Each show is written to its own subdirectory of the output directory."
+        ),
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    arg_parser.add_argument(
+        "patterns",
+        nargs="+",
+        metavar="PATH",
+        help="Show files, directories containing show files, or glob patterns (quote them)."
+    )
+    add_build_arguments(arg_parser)
+    arg_parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of shows built at the same time (default: number of CPUs)"
+    )
+    arg_parser.set_defaults(note_map=None, verbose=False, watch=False)
+    args = arg_parser.parse_args()
+    check_backend_arguments(arg_parser, args)
+
+    from show_orchestrator.batch import ShowResult, find_show_files, format_summary, get_output_dirs
+
+    files = find_show_files(args.patterns)
+    if not files:
+        arg_parser.error("no show files found")
+    show_args = [
+        argparse.Namespace(**{**vars(args), "file": file, "output_dir": output_dir})
+        for file, output_dir in zip(files, get_output_dirs(files, args.output_dir))
+    ]
+
+    start = time.perf_counter()
+    results: dict[Path, ShowResult] = {}
+    workers = max(1, min(args.workers, len(show_args)))
+    if workers == 1:
+        for index, show in enumerate(show_args, 1):
+            results[show.file] = result = build_show(show)
+            print(f"[{index}/{len(show_args)}] {result.file}: {'ok' if result.error is None else 'FAILED'}")
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(build_show, show) for show in show_args]
+            for index, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                results[result.file] = result
+                print(f"[{index}/{len(show_args)}] {result.file}: {'ok' if result.error is None else 'FAILED'}")
+
+    print(format_summary([results[show.file] for show in show_args], time.perf_counter() - start))
+    if any(result.error is not None for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import sys
+from pathlib import Path
+
+from benchmarks.pipeline import compare_results, format_results, load_results, run_benchmark, save_results
+from benchmarks.startup import format_startup_results, run_startup_benchmark
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="Benchmark the show build pipeline on synthetic shows.",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    subparsers = arg_parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Time each pipeline stage and save the results as JSON.")
+    run_parser.add_argument("-o", "--output", type=Path, help="JSON file to write the results to.")
+    run_parser.add_argument("--songs", type=int, default=40)
+    run_parser.add_argument("--events", type=int, default=200, help="Events per effect type per song.")
+    run_parser.add_argument("--effects-with-notes", type=int, default=60)
+    run_parser.add_argument("--effects-without-notes", type=int, default=20)
+    run_parser.add_argument("--extra-tracks", type=int, default=1, help="Extra audio tracks per song.")
+    run_parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the fastest is kept.")
+    run_parser.add_argument("--seed", type=int, default=0)
+
+    compare_parser = subparsers.add_parser("compare", help="Flag stages that got slower than a baseline.")
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("current", type=Path)
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Allowed slowdown as a fraction of the baseline (default: 0.1)"
+    )
+
+    startup_parser = subparsers.add_parser(
+        "startup", help="Time importing each package module and starting the CLI in a fresh interpreter."
+    )
+    startup_parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement; the fastest is kept.")
+
+    args = arg_parser.parse_args()
+    if args.command == "startup":
+        print(format_startup_results(run_startup_benchmark(repeat=args.repeat)))
+        return
+    if args.command == "run":
+        results = run_benchmark(
+            repeat=args.repeat,
+            songs=args.songs,
+            events_per_effect_type=args.events,
+            effects_with_notes=args.effects_with_notes,
+            effects_without_notes=args.effects_without_notes,
+            extra_tracks=args.extra_tracks,
+            seed=args.seed,
+        )
+        print(format_results(results))
+        if args.output:
+            save_results(results, args.output)
+        return
+
+    regressions = compare_results(load_results(args.baseline), load_results(args.current), args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+    print("No regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import json
+import platform
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import generate_show, write_csv, write_yaml
+from show_orchestrator.backends.reaper import ReaperBackend
+from show_orchestrator.generator import MidiGenerator
+from show_orchestrator.parser import Parser
+
+
+STAGES = ["parse", "parse_cached", "generate_midi", "create_project", "save_project"]
+SHOW_FORMATS = ["yaml", "csv"]
+
+
+def time_pipeline(show_file: Path, output_dir: Path) -> dict[str, float]:
+    timings = {}
+    start = time.perf_counter()
+    show_data = Parser().load_show(show_file)
+    timings["parse"] = time.perf_counter() - start
+
+    Parser(cache_dir=output_dir).load_show(show_file)
+    start = time.perf_counter()
+    Parser(cache_dir=output_dir).load_show(show_file)
+    timings["parse_cached"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    midi_generator = MidiGenerator()
+    midi_file_paths = midi_generator.generate_midi_files(show_data, output_dir)
+    timings["generate_midi"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    backend = ReaperBackend()
+    backend.create_project(midi_generator.compiled_show, midi_file_paths, output_dir)
+    timings["create_project"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    backend.save_project(output_dir / f"{show_file.stem}.rpp")
+    timings["save_project"] = time.perf_counter() - start
+    return timings
+
+
+def run_benchmark(repeat: int = 3, **show_options) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as temporary_dir:
+        base_dir = Path(temporary_dir)
+        show = generate_show(media_dir=base_dir / "media", **show_options)
+        write_yaml(show, base_dir / "show.yaml")
+        write_csv(show, base_dir / "show.csv")
+        for show_format in SHOW_FORMATS:
+            best = {}
+            for _ in range(repeat):
+                output_dir = base_dir / "build"
+                shutil.rmtree(output_dir, ignore_errors=True)
+                output_dir.mkdir()
+                timings = time_pipeline(base_dir / f"show.{show_format}", output_dir)
+                for stage, seconds in timings.items():
+                    best[stage] = min(best.get(stage, seconds), seconds)
+            results[show_format] = best
+    return {
+        "config": {"repeat": repeat, **show_options},
+        "python": platform.python_version(),
+        "results": results,
+    }
+
+
+def compare_results(baseline: dict, current: dict, threshold: float) -> list[str]:
+    regressions = []
+    for show_format, stages in current["results"].items():
+        for stage, seconds in stages.items():
+            baseline_seconds = baseline["results"].get(show_format, {}).get(stage)
+            if not baseline_seconds:
+                continue
+            change = seconds / baseline_seconds - 1
+            if change > threshold:
+                regressions.append(
+                    f"{show_format}/{stage}: {baseline_seconds * 1000:.1f} ms -> {seconds * 1000:.1f} ms "
+                    f"(+{change:.0%})"
+                )
+    return regressions
+
+
+def format_results(results: dict) -> str:
+    lines = [f"{'stage':<16}" + "".join(f"{show_format:>12}" for show_format in results["results"])]
+    for stage in STAGES:
+        lines.append(f"{stage:<16}" + "".join(
+            f"{stages[stage] * 1000:>9.1f} ms" for stages in results["results"].values()
+        ))
+    return "\n".join(lines)
+
+
+def load_results(file_path: Path) -> dict:
+    with open(file_path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_results(results: dict, file_path: Path) -> None:
+    with open(file_path, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
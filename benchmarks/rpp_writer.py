@@ -0,0 +1,70 @@
+import argparse
+import filecmp
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from show_orchestrator.backends.reaper import ReaperBackend
+from show_orchestrator.models import AudioTrack, EffectType, ExtraAudioTrack, Show
+
+
+def build_show(media_dir: Path, songs: int, extra_tracks: int) -> tuple[Show, dict]:
+    media_file = media_dir / "media.wav"
+    media_file.write_bytes(b"RIFF")
+    audio_tracks = []
+    midi_files = {}
+    for song in range(songs):
+        name = f"Song {song}"
+        audio_tracks.append(AudioTrack(
+            name=name,
+            duration=180.5,
+            file_path=str(media_file),
+            events={effect_type: [] for effect_type in EffectType},
+            extra_tracks=[
+                ExtraAudioTrack(name=f"{name} extra {extra}", file_path=str(media_file), timestamp=1.5, duration=30)
+                for extra in range(extra_tracks)
+            ]
+        ))
+        midi_files[name] = {
+            effect_type: {"file_path": media_dir / f"{name}_{effect_type}.mid", "duration": 179.9}
+            for effect_type in EffectType
+        }
+    effects = {effect_type: [] for effect_type in EffectType}
+    return Show(audio_tracks=audio_tracks, effects=effects), midi_files
+
+
+def run(show: Show, midi_files: dict, output_dir: Path, streaming: bool) -> tuple[float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    backend = ReaperBackend(streaming=streaming)
+    backend.create_project(show, midi_files, output_dir)
+    backend.save_project(output_dir / "show.rpp")
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Compare the streaming RPP writer with reathon.")
+    arg_parser.add_argument("--songs", type=int, default=2000)
+    arg_parser.add_argument("--extra-tracks", type=int, default=2)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporary_dir:
+        base_dir = Path(temporary_dir)
+        show, midi_files = build_show(base_dir, args.songs, args.extra_tracks)
+        outputs = {}
+        for label, streaming in (("reathon", False), ("streaming", True)):
+            output_dir = base_dir / label
+            output_dir.mkdir()
+            elapsed, peak = run(show, midi_files, output_dir, streaming)
+            outputs[label] = output_dir / "show.rpp"
+            print(f"{label:>10}: {elapsed * 1000:8.1f} ms, peak {peak / 1024 / 1024:6.1f} MiB")
+        identical = filecmp.cmp(outputs["reathon"], outputs["streaming"], shallow=False)
+        print(f"identical output: {identical}")
+
+
+if __name__ == "__main__":
+    main()
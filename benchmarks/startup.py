@@ -0,0 +1,57 @@
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+MODULES = [
+    "show_orchestrator.backends",
+    "show_orchestrator.models",
+    "show_orchestrator.parser",
+    "show_orchestrator.generator",
+    "show_orchestrator.backends.reaper",
+    "show_orchestrator.playback",
+    "main",
+]
+COMMANDS = {
+    "python": ["-c", "pass"],
+    "main.py --help": ["main.py", "--help"],
+}
+
+
+def measure_import_time(module: str, repeat: int) -> float:
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        )
+        seconds = float(result.stdout)
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def measure_command_time(arguments: list[str], repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *arguments], cwd=ROOT_DIR, capture_output=True, check=True)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def run_startup_benchmark(repeat: int = 5) -> dict:
+    return {
+        "imports": {module: measure_import_time(module, repeat) for module in MODULES},
+        "commands": {name: measure_command_time(arguments, repeat) for name, arguments in COMMANDS.items()},
+    }
+
+
+def format_startup_results(results: dict) -> str:
+    lines = [f"{'import':<36}{'time':>12}"]
+    lines.extend(f"{module:<36}{seconds * 1000:>9.1f} ms" for module, seconds in results["imports"].items())
+    lines.append(f"{'command':<36}{'wall':>12}")
+    lines.extend(f"{name:<36}{seconds * 1000:>9.1f} ms" for name, seconds in results["commands"].items())
+    return "\n".join(lines)
@@ -0,0 +1,107 @@
+import csv
+import random
+import wave
+from pathlib import Path
+
+import yaml
+
+from show_orchestrator.models import EffectType
+
+
+def format_timestamp(seconds: float) -> str:
+    minutes, seconds = divmod(seconds, 60)
+    return f"{int(minutes)}:{seconds:06.3f}"
+
+
+def write_silent_wav(file_path: Path, seconds: float = 0.1, frame_rate: int = 8000) -> None:
+    with wave.open(str(file_path), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(frame_rate)
+        wav_file.writeframes(b"\0\0" * int(seconds * frame_rate))
+
+
+def generate_show(songs: int = 40, events_per_effect_type: int = 200, effects_with_notes: int = 60,
+                  effects_without_notes: int = 20, extra_tracks: int = 1, song_duration: float = 240.0,
+                  media_dir: Path | None = None, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    effect_types = list(EffectType)
+    effects = {effect_type: [] for effect_type in effect_types}
+    for index in range(effects_with_notes + effects_without_notes):
+        effect_type = effect_types[index % len(effect_types)]
+        effect = {"id": f"effect_{index}", "name": f"Effect {index}"}
+        if index < effects_with_notes:
+            effect["note"] = index % 128
+            effect["channel"] = index // 128
+        effects[effect_type].append(effect)
+
+    media_file = None
+    if media_dir is not None and extra_tracks:
+        media_dir.mkdir(parents=True, exist_ok=True)
+        media_file = media_dir / "extra.wav"
+        write_silent_wav(media_file)
+
+    audio_tracks = []
+    for song in range(songs):
+        events = {}
+        for effect_type in effect_types:
+            effect_ids = [effect["id"] for effect in effects[effect_type]]
+            events[effect_type.value] = [
+                {
+                    "timestamp": format_timestamp(rng.uniform(0, song_duration - 1)),
+                    "effect_id": rng.choice(effect_ids),
+                    "duration": round(rng.uniform(0.05, 5.0), 3) if rng.random() < 0.5 else None,
+                }
+                for _ in range(events_per_effect_type if effect_ids else 0)
+            ]
+        audio_track = {
+            "name": f"Song {song}",
+            "duration": format_timestamp(song_duration),
+            "events": events,
+        }
+        if media_file is not None:
+            audio_track["extra_tracks"] = [
+                {
+                    "name": f"Song {song} extra {extra}",
+                    "file_path": str(media_file),
+                    "timestamp": format_timestamp(rng.uniform(0, song_duration / 2)),
+                    "duration": 1.0,
+                }
+                for extra in range(extra_tracks)
+            ]
+        audio_tracks.append(audio_track)
+    return {
+        "audio_tracks": audio_tracks,
+        "effects": {effect_type.value: effect_list for effect_type, effect_list in effects.items()},
+    }
+
+
+def write_yaml(show: dict, file_path: Path) -> None:
+    with open(file_path, "w", encoding="utf-8") as file:
+        yaml.safe_dump(show, file, sort_keys=False, allow_unicode=True)
+
+
+def write_csv(show: dict, file_path: Path) -> None:
+    notes = {
+        effect["id"]: effect.get("note")
+        for effect_list in show["effects"].values()
+        for effect in effect_list
+    }
+    with open(file_path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["name", "type", "timestamp", "duration", "note", "file"])
+        for audio_track in show["audio_tracks"]:
+            writer.writerow([audio_track["name"], "audio", "", audio_track["duration"], "", ""])
+            for extra_track in audio_track.get("extra_tracks") or []:
+                writer.writerow([
+                    extra_track["name"], "extra track", extra_track["timestamp"],
+                    extra_track["duration"], "", extra_track["file_path"]
+                ])
+            for effect_type, events in audio_track["events"].items():
+                for event in events:
+                    note = notes[event["effect_id"]]
+                    writer.writerow([
+                        event["effect_id"], effect_type, event["timestamp"],
+                        "" if event["duration"] is None else event["duration"],
+                        "" if note is None else note, ""
+                    ])
@@ -1,13 +1,149 @@
 import argparse
+import inspect
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from show_orchestrator.parser import Parser
-from show_orchestrator.generator import MidiGenerator
-from show_orchestrator.backends.reaper import ReaperBackend
+from show_orchestrator.backends import BACKEND_ENTRY_POINT_GROUP, BUILTIN_BACKENDS, load_backend
+from show_orchestrator.layouts import CollisionPolicy, MidiLayout
+from show_orchestrator.watch import watch_file
 
-AVAILABLE_BACKENDS = {
-    "reaper": ReaperBackend,
-}
+if TYPE_CHECKING:
+    from show_orchestrator.models import Show
+
+
+def add_build_arguments(arg_parser: argparse.ArgumentParser) -> None:
+    arg_parser.add_argument(
+        "-o", "--output-dir",
+        type=Path,
+        default=Path("build"),
+        help="Directory to save the generated files (default: ./build/)"
+    )
+
+    arg_parser.add_argument(
+        "--orchestrate",
+        metavar="BACKEND",
+        help=(
+            "Generate MIDI files AND create a project file for the specified backend.\n"
+            "Without it only the MIDI files are generated.\n"
+            f"Available backends: {', '.join(BUILTIN_BACKENDS)}, plus any registered under\n"
+            f"the '{BACKEND_ENTRY_POINT_GROUP}' entry point group"
+        )
+    )
+
+    arg_parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes used to render MIDI files (default: 1)"
+    )
+
+    arg_parser.add_argument(
+        "--midi-layout",
+        choices=[layout.value for layout in MidiLayout],
+        default=MidiLayout.PER_TRACK.value,
+        help=(
+            "How MIDI files are grouped (default: per-track):\n"
+            "  per-track: one file per audio track and effect type\n"
+            "  per-effect: one multi-track file per effect type for the whole show\n"
+            "  per-song: one multi-track file per audio track with a track per effect type"
+        )
+    )
+
+    arg_parser.add_argument(
+        "--collisions",
+        choices=[policy.value for policy in CollisionPolicy],
+        default=CollisionPolicy.FLAG.value,
+        help=(
+            "What to do with overlapping events on the same note and channel (default: flag):\n"
+            "  ignore: write them as they are\n"
+            "  flag: write them as they are and print a warning\n"
+            "  merge: join them into a single note spanning all of them"
+        )
+    )
+
+    arg_parser.add_argument(
+        "--optimize-midi",
+        action="store_true",
+        help=(
+            "Clean up the MIDI stream before it is written: merge overlapping notes on the same\n"
+            "note and channel, drop notes shorter than half a tick and send note_off before\n"
+            "note_on when both fall on the same tick."
+        )
+    )
+
+    arg_parser.add_argument(
+        "--min-retrigger-gap",
+        type=float,
+        default=0.0,
+        metavar="SECONDS",
+        help="With --optimize-midi, join notes that restart less than this long after they end (default: 0)"
+    )
+
+    arg_parser.add_argument(
+        "--service-map",
+        type=Path,
+        metavar="FILE",
+        help=(
+            "JSON file mapping homeassistant effect ids to service calls, for --orchestrate homeassistant.\n"
+            "Effects missing from it whose id is an entity id call homeassistant.turn_on."
+        )
+    )
+
+    arg_parser.add_argument(
+        "--media-durations",
+        choices=["trust", "check", "probed"],
+        help=(
+            "How audio durations typed in the show file are treated\n"
+            "(default: check with --orchestrate, trust for MIDI-only builds):\n"
+            "  trust: use them without reading the media files\n"
+            "  check: read the WAV/AIFF/MP3 headers and warn when they disagree\n"
+            "  probed: read the headers and use the real durations instead"
+        )
+    )
+
+    arg_parser.add_argument(
+        "--duration-tolerance",
+        type=float,
+        default=0.5,
+        metavar="SECONDS",
+        help="Largest difference between typed and real durations that is not reported (default: 0.5)"
+    )
+
+    arg_parser.add_argument(
+        "--sequential",
+        action="store_true",
+        help=(
+            "Render every MIDI file before building the project.\n"
+            "By default media staging starts right away and each song is added to the project\n"
+            "as soon as its MIDI files are rendered."
+        )
+    )
+
+    arg_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip outputs whose inputs are unchanged since the last build in the output directory."
+    )
+
+    arg_parser.add_argument(
+        "--no-show-cache",
+        action="store_true",
+        help="Always reparse the show file instead of loading the compiled copy kept in the output directory."
+    )
+
+
+def check_backend_arguments(arg_parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    if not args.orchestrate:
+        if args.service_map:
+            arg_parser.error("--service-map requires --orchestrate")
+        return
+    try:
+        backend = load_backend(args.orchestrate)
+    except ValueError as error:
+        arg_parser.error(str(error))
+    if args.service_map and "service_map" not in inspect.signature(backend).parameters:
+        arg_parser.error(f"the {args.orchestrate} backend does not take a --service-map")
 
 
 def main():
@@ -22,38 +158,248 @@ def main():
         help="Path to the show definition YAML/CSV file."
     )
 
+    add_build_arguments(arg_parser)
+
     arg_parser.add_argument(
-        "-o", "--output-dir",
+        "--note-map",
         type=Path,
-        default=Path("build"),
-        help="Directory to save the generated files (default: ./build/)"
+        metavar="FILE",
+        help="JSON file used to keep auto-assigned notes stable between builds."
     )
 
     arg_parser.add_argument(
-        "--orchestrate",
-        choices=AVAILABLE_BACKENDS.keys(),
-        metavar="BACKEND",
+        "-v", "--verbose",
+        action="store_true",
+        help="Print how each media file was staged and how long it took."
+    )
+
+    arg_parser.add_argument(
+        "--watch",
+        action="store_true",
         help=(
-            "Generate MIDI files AND create a project file for the specified backend.\n"
-            f"Available backends: {', '.join(AVAILABLE_BACKENDS.keys())}"
+            "Keep running and rebuild whenever the show file is saved.\n"
+            "Only changed MIDI files and the project are rewritten."
         )
     )
 
+    arg_parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=0.2,
+        metavar="SECONDS",
+        help="How often the show file is checked in watch mode (default: 0.2)"
+    )
+
+    arg_parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print wall time, events, messages and bytes written for each build stage."
+    )
+
+    arg_parser.add_argument(
+        "--profile-output",
+        type=Path,
+        metavar="FILE",
+        help="Save the per-stage measurements to a JSON file."
+    )
+
+    arg_parser.add_argument(
+        "--tracemalloc",
+        action="store_true",
+        help="Also record the peak memory of each build stage (slower)."
+    )
+
+    arg_parser.add_argument(
+        "--cprofile",
+        type=Path,
+        metavar="FILE",
+        help="Run the build under cProfile and dump the stats to a file."
+    )
+
     args = arg_parser.parse_args()
+    check_backend_arguments(arg_parser, args)
     args.output_dir.mkdir(parents=True, exist_ok=True)
-        
-    file: Path = args.file
-    parser = Parser()
-    show_data = parser.load_show(file)
 
-    midi_generator = MidiGenerator()
-    midi_file_paths = midi_generator.generate_midi_files(show_data, args.output_dir)
+    profiling = args.profile or args.profile_output or args.tracemalloc
+    if profiling:
+        from show_orchestrator.instrumentation import profiler
+
+        profiler.enable(trace_memory=args.tracemalloc)
+
+    session = BuildSession(args)
+    run = session.watch if args.watch else session.build
+    if args.cprofile:
+        import cProfile
+
+        with cProfile.Profile() as profile:
+            run()
+        profile.dump_stats(args.cprofile)
+    else:
+        run()
+
+    if profiling:
+        if args.profile or args.tracemalloc:
+            print(profiler.format_table())
+        if args.profile_output:
+            profiler.save(args.profile_output)
+
+
+class BuildSession:
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        from show_orchestrator.allocator import NoteAllocator
+        from show_orchestrator.generator import MidiGenerator
+        from show_orchestrator.manifest import BuildManifest
+        from show_orchestrator.media_probe import MediaProbeCache
+        from show_orchestrator.parser import Parser
+
+        self.args = args
+        self.backend = load_backend(args.orchestrate) if args.orchestrate else None
+        self.backend_options = {}
+        if args.service_map:
+            from show_orchestrator.homeassistant import load_service_map
+
+            self.backend_options["service_map"] = load_service_map(args.service_map)
+        self.parser = Parser(
+            cache_dir=None if args.no_show_cache or args.watch else args.output_dir,
+            reuse_tracks=args.watch
+        )
+        self.manifest = None
+        if args.incremental or args.watch:
+            self.manifest = BuildManifest(args.output_dir, load=args.incremental)
+        self.media_probe = None
+        if args.media_durations is None:
+            args.media_durations = "check" if args.orchestrate else "trust"
+        if args.media_durations != "trust":
+            self.media_probe = MediaProbeCache(None if args.no_show_cache else args.output_dir)
+        self.note_allocator = NoteAllocator()
+        if args.note_map:
+            self.note_allocator.load(args.note_map)
+        self.midi_generator = MidiGenerator(
+            jobs=args.jobs,
+            manifest=self.manifest,
+            note_allocator=self.note_allocator,
+            layout=args.midi_layout,
+            collisions=args.collisions,
+            optimize=args.optimize_midi,
+            min_retrigger_gap=args.min_retrigger_gap
+        )
+
+    def build(self, show_data: "Show | None" = None) -> None:
+        args = self.args
+        file: Path = args.file
+        if show_data is None:
+            show_data = self.parser.load_show(file)
+        if self.media_probe is not None:
+            show_data = self._probe_media(show_data)
+
+        compiled_show = self.midi_generator.compile_show(show_data)
+        if args.note_map:
+            self.note_allocator.save(args.note_map)
+        self._report_collisions()
+        if args.optimize_midi:
+            self._report_optimizer()
+
+        midi_files = self.midi_generator.iter_midi_files(compiled_show, args.output_dir)
+        orchestrator = self.backend(manifest=self.manifest, **self.backend_options) if self.backend is not None else None
+        if orchestrator is not None and not args.sequential and hasattr(orchestrator, "add_audio_track"):
+            orchestrator.begin_project(
+                compiled_show, args.output_dir, self.midi_generator.has_combined_midi(compiled_show)
+            )
+            for (_, track_midi_files), audio_track in zip(midi_files, compiled_show.audio_tracks):
+                orchestrator.add_audio_track(audio_track, track_midi_files)
+        else:
+            midi_file_paths = dict(midi_files)
+            if orchestrator is not None:
+                orchestrator.create_project(compiled_show, midi_file_paths, args.output_dir)
+
+        if orchestrator is not None:
+            orchestrator.save_project(args.output_dir / f"{file.stem}{self.backend.PROJECT_SUFFIX}")
+
+            if args.verbose:
+                for staged in orchestrator.staged_media:
+                    print(f"{staged.destination.name}: {staged.method}, {staged.size} bytes in {staged.seconds * 1000:.1f} ms")
+
+        if args.incremental:
+            self.manifest.save()
+
+    def _probe_media(self, show_data: "Show") -> "Show":
+        from show_orchestrator.instrumentation import profiler
+        from show_orchestrator.media_probe import apply_probed_durations, find_duration_mismatches, get_media_files
+
+        with profiler.stage("media_probe"):
+            media = self.media_probe.probe_all(get_media_files(show_data))
+            self.media_probe.save()
+        profiler.count("media_probe", events=len(media))
+        for file_path, info in media.items():
+            if isinstance(info, Exception):
+                print(f"Warning: could not read {file_path}: {info}")
+            elif self.args.verbose:
+                print(f"{file_path}: {info.format}, {info.duration:.3f} s, {info.sample_rate} Hz, {info.channels} channels")
+        mismatches = find_duration_mismatches(show_data, media, self.args.duration_tolerance)
+        use_probed = self.args.media_durations == "probed"
+        for mismatch in mismatches:
+            print(
+                f"{'Using probed duration' if use_probed else 'Warning'}: '{mismatch.track}' is declared as "
+                f"{mismatch.declared:.3f} s but {mismatch.file_path} is {mismatch.probed:.3f} s"
+            )
+        return apply_probed_durations(show_data, mismatches) if use_probed else show_data
+
+    def _report_optimizer(self) -> None:
+        stats = self.midi_generator.optimizer_stats
+        if not stats.removed_messages:
+            return
+        print(
+            f"Optimizer removed {stats.removed_messages} MIDI messages ({stats.overlapping} overlapping, "
+            f"{stats.retriggers} retriggered and {stats.zero_length} zero-length notes)"
+        )
+
+    def _report_collisions(self) -> None:
+        collisions = self.midi_generator.collisions
+        count = sum(len(track_collisions) for track_collisions in collisions.values())
+        if not count:
+            return
+        action = "merged" if self.args.collisions == CollisionPolicy.MERGE else "found"
+        print(f"Warning: {count} overlapping events on the same note {action} in {len(collisions)} audio tracks")
+        if not self.args.verbose:
+            return
+        effects = self.midi_generator.compiled_show.effects
+        for track_name, track_collisions in collisions.items():
+            for first, second in track_collisions:
+                print(
+                    f"  {track_name}: '{effects[second.effect_index].id}' at {second.start:.3f} s overlaps "
+                    f"'{effects[first.effect_index].id}' at {first.start:.3f}-{first.end:.3f} s "
+                    f"(note {second.note}, channel {second.channel})"
+                )
+
+    def watch(self) -> None:
+        self.build()
+        self.manifest.advance()
+        print(f"Watching {self.args.file} for changes (Ctrl+C to stop)")
+        try:
+            for saved_at in watch_file(self.args.file, self.args.watch_interval):
+                start = time.perf_counter()
+                try:
+                    show_data = self.parser.load_show(self.args.file)
+                except Exception as error:
+                    print(f"Could not load {self.args.file}: {error}")
+                    continue
+                try:
+                    self.build(show_data)
+                except Exception as error:
+                    self.manifest.clear()
+                    print(f"Build failed: {error}")
+                    continue
+                skipped = self.manifest.skipped
+                self.manifest.advance()
+                print(
+                    f"Rebuilt in {(time.perf_counter() - start) * 1000:.0f} ms, "
+                    f"ready {(time.time() - saved_at) * 1000:.0f} ms after save "
+                    f"({skipped} outputs unchanged)"
+                )
+        except KeyboardInterrupt:
+            pass
 
-    backend_name = args.orchestrate
-    orchestrator = AVAILABLE_BACKENDS[backend_name]()
-    
-    orchestrator.create_project(show_data, midi_file_paths, args.output_dir)
-    orchestrator.save_project(args.output_dir / f"{file.stem}.rpp")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -7,18 +7,32 @@ from pathlib import Path
 
 import mido
 
+from show_orchestrator.allocator import NoteAllocator
+from show_orchestrator.compiler import compile_show
+from show_orchestrator.effect_index import EffectIndex
+from show_orchestrator.intervals import IntervalIndex
 from show_orchestrator.parser import Parser
 from show_orchestrator.models import Show
+from show_orchestrator.ports import PortManager
+from show_orchestrator.smf import DEFAULT_VELOCITY
 
 
 class NoteMapper:
 
-    def __init__(self, root: tkinter.Tk) -> None:
+    def __init__(self, root: tkinter.Tk, note_map: Path | None = None, note_duration: float = 0.1) -> None:
         self.root = root
         self.show = None
         self.default_channel = 0
+        self.note_map = note_map
+        self.note_allocator = NoteAllocator(self.default_channel)
+        if note_map:
+            self.note_allocator.load(note_map)
         self.effect_mapping = defaultdict(dict)
-        self.root.geometry("500x400")
+        self.interval_indexes: dict[str, IntervalIndex] = {}
+        self.song_durations: dict[str, float] = {}
+        self.scrub_notes: set[tuple[int, int]] = set()
+        self.scrub_port = None
+        self.root.geometry("500x450")
         self.root.rowconfigure(2, weight=1)
         self.root.columnconfigure(0, weight=1)
         self.root.title("Note Mapper")
@@ -28,6 +42,12 @@ class NoteMapper:
         self.midi_port_dropdown = ttk.Combobox(root, values=self.available_ports)
         self.midi_port_dropdown.set(self.available_ports[0])
         self.midi_port_dropdown.grid(row=1, column=0, pady=5)
+        self.midi_port_dropdown.bind("<<ComboboxSelected>>", lambda e: self._prepare_midi_port())
+        self.status_label = tkinter.Label(root, text="")
+        self.status_label.grid(row=3, column=0, pady=5)
+        self.port_manager = PortManager(note_duration=note_duration)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self._prepare_midi_port()
 
     def load_show(self, file_path: str) -> Show:
         parser = Parser()
@@ -37,75 +57,146 @@ class NoteMapper:
     def _map_show_effects_to_notes(self) -> dict[str, int]:
         if not self.show:
             return
-        effects_without_note = defaultdict(list)
-        used_notes_per_channel = defaultdict(set)
+        self.note_allocator.assign_effects(self.show.effects)
+        if self.note_map:
+            self.note_allocator.save(self.note_map)
         for effect_type, effect_list in self.show.effects.items():
             for effect in effect_list:
-                note = effect.note
                 if effect.channel is None:
                     effect.channel = self.default_channel
-                if note is None:
-                    effects_without_note[effect_type].append(effect)
-                    continue
-                used_notes_per_channel[effect.channel].add(note)
-                self.effect_mapping[effect_type][effect.id] = effect
-        for effect_type, effect_list in effects_without_note.items():
-            for effect in effect_list:
-                note = 0
-                used_notes = used_notes_per_channel[effect.channel]
-                while note in used_notes:
-                    note += 1
-                effect.note = note
-                used_notes_per_channel[effect.channel].add(note)
                 self.effect_mapping[effect_type][effect.id] = effect
         return self.effect_mapping
 
     def run(self) -> None:
         self._map_show_effects_to_notes()
+        self.effect_index = EffectIndex(self.effect_mapping)
         container = tkinter.Frame(self.root)
         container.grid(row=2, column=0, pady=10, padx=10, sticky="nsew")
-        container.rowconfigure(0, weight=1)
+        container.rowconfigure(1, weight=1)
         container.columnconfigure(0, weight=1)
-        canvas = tkinter.Canvas(container)
-        scrollbar = ttk.Scrollbar(container, orient="vertical", command=canvas.yview)
-        scrollable_frame = tkinter.Frame(canvas)
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(
-                scrollregion=canvas.bbox("all")
+        self.search_var = tkinter.StringVar()
+        self.search_var.trace_add("write", lambda *_: self._filter_effects())
+        search_entry = ttk.Entry(container, textvariable=self.search_var)
+        search_entry.grid(row=0, column=0, pady=(0, 5), sticky="ew")
+        self.play_button = ttk.Button(container, text="Play Note", command=self._play_selected)
+        self.play_button.grid(row=0, column=1, columnspan=2, padx=(5, 0), pady=(0, 5))
+        self.effect_tree = ttk.Treeview(container, columns=("name", "note", "channel"), selectmode="browse")
+        self.effect_tree.heading("#0", text="Effect ID")
+        self.effect_tree.heading("name", text="Name")
+        self.effect_tree.heading("note", text="Note")
+        self.effect_tree.heading("channel", text="Channel")
+        self.effect_tree.column("note", width=50, stretch=False, anchor="e")
+        self.effect_tree.column("channel", width=60, stretch=False, anchor="e")
+        scrollbar = ttk.Scrollbar(container, orient="vertical", command=self.effect_tree.yview)
+        self.effect_tree.configure(yscrollcommand=scrollbar.set)
+        self.effect_tree.grid(row=1, column=0, columnspan=2, sticky="nsew")
+        scrollbar.grid(row=1, column=2, sticky="ns")
+        self.effect_tree.bind("<Double-1>", lambda e: self._play_selected())
+        self.effect_tree.bind("<Return>", lambda e: self._play_selected())
+
+        for effect_type in self.effect_mapping:
+            self.effect_tree.insert("", "end", iid=effect_type, text=f"Effect Type: {effect_type}", open=True)
+        for index, (effect_type, effect) in enumerate(self.effect_index.entries):
+            self.effect_tree.insert(
+                effect_type, "end", iid=str(index), text=effect.id, values=(effect.name, effect.note, effect.channel)
             )
-        )
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        scrollbar.pack(side="right", fill="y")
-        canvas.pack(side="left", fill="both", expand=True)
-
-        current_row = 0
-        for effect_type, effect_dict in self.effect_mapping.items():
-            effect_type_label = tkinter.Label(scrollable_frame, text=f"Effect Type: {effect_type}", font=("Arial", 14, "bold"))
-            effect_type_label.grid(row=current_row, column=0, columnspan=2, pady=10)
-            current_row += 1
-            for effect_id, effect in effect_dict.items():
-                effect_info = f"Effect ID: {effect_id}, Note: {effect.note}, Channel: {effect.channel}"
-                effect_label = tkinter.Label(scrollable_frame, text=effect_info)
-                effect_button = tkinter.Button(scrollable_frame, text="Play Note", 
-                                               command=lambda n=effect.note, c=effect.channel: self._play_midi_note(n, c))
-                effect_label.grid(row=current_row, column=0, padx=5, pady=5, sticky="w")
-                effect_button.grid(row=current_row, column=1, padx=5, pady=5, sticky="w")
-                current_row += 1
 
+        self._build_scrubber()
+        search_entry.focus_set()
+        self._update_status()
         self.root.mainloop()
 
+    def _filter_effects(self) -> None:
+        matches = self.effect_index.search(self.search_var.get())
+        children = {effect_type: [] for effect_type in self.effect_mapping}
+        for index in matches:
+            children[self.effect_index.entries[index][0]].append(str(index))
+        for effect_type, iids in children.items():
+            self.effect_tree.set_children(effect_type, *iids)
+        self.status_label.configure(text=f"{len(matches)} of {len(self.effect_index)} effects")
+
+    def _play_selected(self) -> None:
+        for iid in self.effect_tree.selection():
+            if iid.isdigit():
+                _, effect = self.effect_index.entries[int(iid)]
+                self._play_midi_note(effect.note, effect.channel)
+
+    def close(self) -> None:
+        self._release_scrub_notes()
+        self.port_manager.close()
+        self.root.destroy()
+
+    def _build_scrubber(self) -> None:
+        compiled_show = compile_show(self.show)
+        for audio_track in compiled_show.audio_tracks:
+            self.interval_indexes[audio_track.name] = IntervalIndex.from_audio_track(audio_track)
+            self.song_durations[audio_track.name] = audio_track.duration
+        if not self.interval_indexes:
+            return
+        scrubber = tkinter.Frame(self.root)
+        scrubber.grid(row=4, column=0, pady=5, padx=10, sticky="ew")
+        scrubber.columnconfigure(1, weight=1)
+        self.song_dropdown = ttk.Combobox(scrubber, values=list(self.interval_indexes), state="readonly")
+        self.song_dropdown.set(next(iter(self.interval_indexes)))
+        self.song_dropdown.grid(row=0, column=0, padx=5)
+        self.song_dropdown.bind("<<ComboboxSelected>>", lambda e: self._select_song())
+        self.scrub_scale = tkinter.Scale(scrubber, orient="horizontal", resolution=0.01, command=self._scrub)
+        self.scrub_scale.grid(row=0, column=1, padx=5, sticky="ew")
+        self._select_song()
+
+    def _select_song(self) -> None:
+        self._release_scrub_notes()
+        self.scrub_scale.configure(to=self.song_durations[self.song_dropdown.get()])
+        self.scrub_scale.set(0)
+
+    def _scrub(self, value: str) -> None:
+        current_port = self.midi_port_dropdown.get()
+        if current_port == "N/A":
+            return
+        if current_port != self.scrub_port:
+            self._release_scrub_notes()
+            self.scrub_port = current_port
+        index = self.interval_indexes[self.song_dropdown.get()]
+        active = {(interval.note, interval.channel) for interval in index.active_at(float(value))}
+        for note, channel in sorted(self.scrub_notes - active):
+            self.port_manager.send(
+                current_port, mido.Message("note_off", note=note, channel=channel, velocity=DEFAULT_VELOCITY)
+            )
+        for note, channel in sorted(active - self.scrub_notes):
+            self.port_manager.send(
+                current_port, mido.Message("note_on", note=note, channel=channel, velocity=DEFAULT_VELOCITY)
+            )
+        self.scrub_notes = active
+
+    def _release_scrub_notes(self) -> None:
+        if self.scrub_port is not None:
+            for note, channel in sorted(self.scrub_notes):
+                self.port_manager.send(
+                    self.scrub_port, mido.Message("note_off", note=note, channel=channel, velocity=DEFAULT_VELOCITY)
+                )
+        self.scrub_notes = set()
+
+    def _prepare_midi_port(self) -> None:
+        current_port = self.midi_port_dropdown.get()
+        if current_port != "N/A":
+            self.port_manager.prepare(current_port)
+
+    def _update_status(self) -> None:
+        if self.port_manager.errors:
+            port_name, error = self.port_manager.errors.pop()
+            self.port_manager.errors.clear()
+            self.status_label.configure(text=f"Error on {port_name}: {error}")
+        elif self.port_manager.send_times:
+            port_name, message, seconds = self.port_manager.send_times[-1]
+            self.status_label.configure(text=f"Last {message.type} on {port_name}: {seconds * 1000:.2f} ms")
+        self.root.after(200, self._update_status)
+
     def _play_midi_note(self, note: int, channel: int) -> None:
         current_port = self.midi_port_dropdown.get()
         if current_port == "N/A":
             tkinter.messagebox.showwarning(title="No MIDI port", message="No MIDI port available for operation")
             return
-        msg_on = mido.Message('note_on', note=note, velocity=127, channel=channel, time=0)
-        msg_off = mido.Message('note_off', note=note, velocity=127, channel=channel, time=0)
-        with mido.open_output(current_port) as port:
-            port.send(msg_on)
-            port.send(msg_off)
+        self.port_manager.play_note(current_port, note, channel)
 
 
 if __name__ == "__main__":
@@ -118,8 +209,20 @@ if __name__ == "__main__":
         type=Path,
         help="Path to the show definition YAML/CSV file."
     )
+    arg_parser.add_argument(
+        "--note-map",
+        type=Path,
+        metavar="FILE",
+        help="JSON file used to keep auto-assigned notes stable between runs."
+    )
+    arg_parser.add_argument(
+        "--note-duration",
+        type=float,
+        default=0.1,
+        help="Seconds between note_on and note_off when auditioning an effect (default: 0.1)"
+    )
     args = arg_parser.parse_args()
     root = tkinter.Tk()
-    app = NoteMapper(root)
+    app = NoteMapper(root, args.note_map, args.note_duration)
     app.show = app.load_show(args.file)
     app.run()
\ No newline at end of file
@@ -0,0 +1,147 @@
+import argparse
+import os
+import threading
+from pathlib import Path
+
+import mido
+
+from show_orchestrator.allocator import NoteAllocator
+from show_orchestrator.generator import MidiGenerator
+from show_orchestrator.parser import Parser
+from show_orchestrator.playback import PlaybackStats, RecordingPort, ShowPlayer
+from show_orchestrator.ports import get_output_names
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="Play a show definition straight to a MIDI output port.",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    arg_parser.add_argument(
+        "file",
+        type=Path,
+        help="Path to the show definition YAML/CSV file."
+    )
+    arg_parser.add_argument(
+        "-p", "--port",
+        help=f"MIDI output port (available: {', '.join(get_output_names()) or 'none'})"
+    )
+    arg_parser.add_argument(
+        "-s", "--song",
+        help="Name of the audio track to start from (default: first)."
+    )
+    arg_parser.add_argument(
+        "--note-map",
+        type=Path,
+        metavar="FILE",
+        help="JSON file with the auto-assigned notes used for the build."
+    )
+    arg_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Schedule the show against an in-process port instead of a MIDI device."
+    )
+    arg_parser.add_argument(
+        "--home-assistant",
+        metavar="URL",
+        help=(
+            "Also send the homeassistant effects to a Home Assistant instance, e.g. http://homeassistant.local:8123\n"
+            "Calls at the same time and service are batched and sent over pooled connections."
+        )
+    )
+    arg_parser.add_argument(
+        "--home-assistant-token",
+        metavar="TOKEN",
+        default=os.environ.get("HASS_TOKEN"),
+        help="Long-lived access token for Home Assistant (default: $HASS_TOKEN)"
+    )
+    arg_parser.add_argument(
+        "--service-map",
+        type=Path,
+        metavar="FILE",
+        help=(
+            "JSON file mapping homeassistant effect ids to service calls.\n"
+            "Effects missing from it whose id is an entity id call homeassistant.turn_on."
+        )
+    )
+    arg_parser.add_argument(
+        "--home-assistant-connections",
+        type=int,
+        default=4,
+        metavar="COUNT",
+        help="Maximum number of concurrent requests to Home Assistant (default: 4)"
+    )
+    args = arg_parser.parse_args()
+
+    show_data = Parser().load_show(args.file)
+    note_allocator = NoteAllocator()
+    if args.note_map:
+        note_allocator.load(args.note_map)
+    compiled_show = MidiGenerator(note_allocator=note_allocator).compile_show(show_data)
+
+    if args.dry_run:
+        port = RecordingPort()
+    else:
+        try:
+            port = mido.open_output(args.port)
+        except (ImportError, OSError) as error:
+            arg_parser.error(f"cannot open MIDI output port {args.port or '(default)'}: {error}")
+    player = ShowPlayer(compiled_show, port)
+    if args.song:
+        try:
+            player.seek(args.song)
+        except ValueError as error:
+            if not args.dry_run:
+                port.close()
+            arg_parser.error(str(error))
+
+    dispatcher = None
+    dispatcher_thread = None
+    if args.home_assistant:
+        from show_orchestrator.homeassistant import (
+            HomeAssistantClient, HomeAssistantDispatcher, get_service_calls, load_service_map
+        )
+
+        service_map = load_service_map(args.service_map) if args.service_map else None
+        calls, unmapped = get_service_calls(compiled_show, service_map)
+        if unmapped:
+            print(f"Warning: no service call for homeassistant effects: {', '.join(sorted(unmapped))}")
+        client = HomeAssistantClient(args.home_assistant, args.home_assistant_token, args.home_assistant_connections)
+        dispatcher = HomeAssistantDispatcher(calls, client)
+        dispatcher_thread = threading.Thread(target=dispatcher.play, args=(player.position,), daemon=True)
+        dispatcher_thread.start()
+
+    try:
+        stats = player.play()
+    except KeyboardInterrupt:
+        player.stop()
+        stats = player.stats.summary()
+    finally:
+        if not args.dry_run:
+            port.close()
+        if dispatcher is not None:
+            dispatcher.stop()
+            dispatcher_thread.join()
+            dispatcher.client.close()
+    print(f"Sent {stats.sent} messages, {format_stats(stats)}")
+    if dispatcher is not None:
+        ha_stats = dispatcher.stats.summary()
+        failed = [result for result in dispatcher.results if result.error is not None]
+        print(
+            f"Sent {ha_stats.sent} Home Assistant calls over {dispatcher.client.pool.opened} connections "
+            f"({len(failed)} failed), {format_stats(ha_stats)}"
+        )
+        for result in failed:
+            print(f"  {result.time:.3f} s {result.service}: {result.error}")
+
+
+def format_stats(stats: PlaybackStats) -> str:
+    return (
+        f"latency mean {stats.mean_latency * 1000:.3f} ms "
+        f"max {stats.max_latency * 1000:.3f} ms, lateness mean {stats.mean_lateness * 1000:.3f} ms "
+        f"max {stats.max_lateness * 1000:.3f} ms, jitter {stats.jitter * 1000:.3f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import json
+from pathlib import Path
+
+from show_orchestrator.models import Effect, EffectType
+
+
+MIDI_NOTES = 128
+MIDI_CHANNELS = 16
+ALL_NOTES_FREE = (1 << MIDI_NOTES) - 1
+NOTE_MAP_VERSION = 1
+
+
+class NoteAllocator:
+
+    def __init__(self, default_channel: int = 0) -> None:
+        self.default_channel = default_channel
+        self.free_notes = [ALL_NOTES_FREE] * MIDI_CHANNELS
+        self.saved_notes: dict[str, tuple[int, int]] = {}
+        self.assigned_notes: dict[str, tuple[int, int]] = {}
+
+    def is_free(self, note: int, channel: int) -> bool:
+        return bool(self.free_notes[channel] >> note & 1)
+
+    def _check_channel(self, channel: int) -> None:
+        if not 0 <= channel < MIDI_CHANNELS:
+            raise ValueError(f"Channel {channel} is outside the MIDI range 0-{MIDI_CHANNELS - 1}")
+
+    def reserve(self, note: int, channel: int) -> None:
+        if not 0 <= note < MIDI_NOTES:
+            raise ValueError(f"Note {note} is outside the MIDI range 0-{MIDI_NOTES - 1}")
+        self._check_channel(channel)
+        self.free_notes[channel] &= ~(1 << note)
+
+    def next_free(self, channel: int) -> int | None:
+        free_notes = self.free_notes[channel]
+        if not free_notes:
+            return None
+        return (free_notes & -free_notes).bit_length() - 1
+
+    def allocate(self, channel: int) -> tuple[int, int]:
+        self._check_channel(channel)
+        for offset in range(MIDI_CHANNELS):
+            candidate = (channel + offset) % MIDI_CHANNELS
+            note = self.next_free(candidate)
+            if note is not None:
+                self.reserve(note, candidate)
+                return note, candidate
+        raise ValueError("No free MIDI notes left on any channel")
+
+    def assign_effects(self, effects: dict[EffectType, list[Effect]]) -> dict[str, Effect]:
+        self.free_notes = [ALL_NOTES_FREE] * MIDI_CHANNELS
+        self.saved_notes.update(self.assigned_notes)
+        self.assigned_notes = {}
+        effect_mapping = {}
+        effects_without_note = []
+        for effect_list in effects.values():
+            for effect in effect_list:
+                channel = effect.channel if effect.channel is not None else self.default_channel
+                if effect.note is None:
+                    effects_without_note.append(effect)
+                    continue
+                self.reserve(effect.note, channel)
+                self.assigned_notes[effect.id] = (effect.note, channel)
+                effect_mapping[effect.id] = effect
+        pending = []
+        for effect in effects_without_note:
+            saved = self.saved_notes.get(effect.id)
+            if saved is None or not self._can_restore(effect, *saved):
+                pending.append(effect)
+                continue
+            self._assign(effect, *saved)
+            effect_mapping[effect.id] = effect
+        for effect in pending:
+            channel = effect.channel if effect.channel is not None else self.default_channel
+            self._assign(effect, *self.allocate(channel))
+            effect_mapping[effect.id] = effect
+        return effect_mapping
+
+    def _can_restore(self, effect: Effect, note: int, channel: int) -> bool:
+        if effect.channel is not None and effect.channel != channel:
+            return False
+        return 0 <= note < MIDI_NOTES and 0 <= channel < MIDI_CHANNELS and self.is_free(note, channel)
+
+    def _assign(self, effect: Effect, note: int, channel: int) -> None:
+        self.reserve(note, channel)
+        effect.note = note
+        if effect.channel is not None or channel != self.default_channel:
+            effect.channel = channel
+        self.assigned_notes[effect.id] = (note, channel)
+
+    def load(self, file_path: Path) -> None:
+        if not file_path.exists():
+            return
+        with open(file_path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        if data.get("version") != NOTE_MAP_VERSION:
+            return
+        self.saved_notes = {
+            effect_id: (entry["note"], entry["channel"])
+            for effect_id, entry in data.get("notes", {}).items()
+        }
+
+    def save(self, file_path: Path) -> None:
+        notes = {**self.saved_notes, **self.assigned_notes}
+        with open(file_path, 'w', encoding='utf-8') as file:
+            json.dump({
+                "version": NOTE_MAP_VERSION,
+                "notes": {
+                    effect_id: {"note": note, "channel": channel}
+                    for effect_id, (note, channel) in notes.items()
+                }
+            }, file, indent=2)
@@ -0,0 +1,33 @@
+from importlib import import_module
+
+
+BACKEND_ENTRY_POINT_GROUP = "show_orchestrator.backends"
+BUILTIN_BACKENDS = {
+    "reaper": "show_orchestrator.backends.reaper:ReaperBackend",
+    "homeassistant": "show_orchestrator.backends.homeassistant:HomeAssistantBackend",
+}
+
+
+def _get_entry_points() -> dict:
+    from importlib.metadata import entry_points
+
+    return {
+        entry_point.name: entry_point
+        for entry_point in entry_points(group=BACKEND_ENTRY_POINT_GROUP)
+        if entry_point.name not in BUILTIN_BACKENDS
+    }
+
+
+def get_backend_names() -> list[str]:
+    return [*BUILTIN_BACKENDS, *_get_entry_points()]
+
+
+def load_backend(name: str) -> type:
+    target = BUILTIN_BACKENDS.get(name)
+    if target is not None:
+        module_name, _, class_name = target.partition(":")
+        return getattr(import_module(module_name), class_name)
+    entry_point = _get_entry_points().get(name)
+    if entry_point is None:
+        raise ValueError(f"Unknown backend '{name}'. Available backends: {', '.join(get_backend_names())}")
+    return entry_point.load()
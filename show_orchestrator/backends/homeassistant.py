@@ -0,0 +1,37 @@
+import json
+from pathlib import Path
+
+from show_orchestrator.compiler import CompiledShow, compile_show
+from show_orchestrator.homeassistant import ServiceCall, get_service_calls
+from show_orchestrator.manifest import BuildManifest
+from show_orchestrator.models import Show
+from show_orchestrator.staging import StagedMedia
+
+
+SCHEDULE_VERSION = 1
+
+
+class HomeAssistantBackend:
+    PROJECT_SUFFIX = ".homeassistant.json"
+
+    def __init__(self, manifest: BuildManifest | None = None, service_map: dict[str, dict] | None = None,
+                 batch: bool = True) -> None:
+        self.manifest = manifest
+        self.service_map = service_map
+        self.batch = batch
+        self.calls: list[ServiceCall] = []
+        self.unmapped: set[str] = set()
+        self.staged_media: list[StagedMedia] = []
+
+    def create_project(self, show: Show | CompiledShow, midi_files: dict[str, str], output_dir: Path) -> None:
+        if isinstance(show, Show):
+            show = compile_show(show)
+        self.calls, self.unmapped = get_service_calls(show, self.service_map, self.batch)
+
+    def save_project(self, project_file_path: Path) -> None:
+        with open(project_file_path, 'w', encoding='utf-8') as file:
+            json.dump({
+                "version": SCHEDULE_VERSION,
+                "calls": [call.model_dump() for call in self.calls],
+                "unmapped": sorted(self.unmapped),
+            }, file, indent=2)
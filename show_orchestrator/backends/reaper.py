@@ -1,81 +1,118 @@
+import os
 from pathlib import Path
 
-from reathon.nodes import Project, Track, Item, Source
-
-
+from show_orchestrator.backends.rpp import ReathonWriter, RppWriter
+from show_orchestrator.compiler import CompiledAudioTrack, CompiledShow, compile_show
+from show_orchestrator.instrumentation import profiler
+from show_orchestrator.layouts import COMBINED_MIDI_KEY
+from show_orchestrator.manifest import BuildManifest, new_digest
 from show_orchestrator.models import Show
-from reathon.helper import marker
+from show_orchestrator.staging import MediaStager, StagedMedia
 
 
 class ReaperBackend:
+    PROJECT_SUFFIX = ".rpp"
+
+    def __init__(self, manifest: BuildManifest | None = None, staging_workers: int = 4,
+                 streaming: bool = True) -> None:
+        self.writer = RppWriter() if streaming else ReathonWriter()
+        self.manifest = manifest
+        self.staging_workers = staging_workers
+        self.stager = None
+        self.tracks: dict[str, int] = {}
+        self.current_position = 0
+        self.track_index = 0
+        self.staged_media: list[StagedMedia] = []
 
-    def __init__(self) -> None:
-        self.project = Project()
+    def create_project(self, show: Show | CompiledShow, midi_files: dict[str, str], output_dir: Path) -> None:
+        if isinstance(show, Show):
+            show = compile_show(show)
+        combined_midi = any(COMBINED_MIDI_KEY in track_midi_files for track_midi_files in midi_files.values())
+        self.begin_project(show, output_dir, combined_midi)
+        for track in show.audio_tracks:
+            self.add_audio_track(track, midi_files.get(track.name, {}))
+
+    def begin_project(self, show: CompiledShow, output_dir: Path, combined_midi: bool = False) -> None:
+        self.stager = MediaStager(output_dir, max_workers=self.staging_workers, manifest=self.manifest)
+        self.tracks = {}
+        self.current_position = 0
+        self.track_index = 0
 
-    def create_project(self, show: Show, midi_files: dict[str, str], output_dir: Path) -> None:
-        audio_files_included = any(track.file_path for track in show.audio_tracks)
-        
-        tracks = {}
+        if any(track.file_path for track in show.audio_tracks):
+            self.tracks["audio"] = self.writer.add_track("Audio Files")
 
-        if audio_files_included:
-            audio_track = Track(name="Audio Files")
-            self.project.add(audio_track)
-            tracks["audio"] = audio_track
+        for effect_type in show.effect_types:
+            self.tracks[effect_type] = self.writer.add_track(effect_type)
 
-        for effect_type in show.effects:
-            effect_track = Track(name=effect_type)
-            self.project.add(effect_track)
-            tracks[effect_type] = effect_track
+        if combined_midi:
+            self.tracks[COMBINED_MIDI_KEY] = self.writer.add_track("MIDI")
 
-        current_position = 0
-        track_index = 0
         for track in show.audio_tracks:
             if track.file_path:
-                source = Source(file=str(track.file_path))
-                item = Item(
-                    source,
-                    position=current_position,
-                    length=track.duration_seconds
-                )
-                tracks["audio"].add(item)
-                file_path = Path(track.file_path)
-                output_audio_path = output_dir / file_path.name
-                if not output_audio_path.exists():
-                    with open(file_path, 'rb') as src_file, open(output_audio_path, 'wb') as dst_file:
-                        dst_file.write(src_file.read())
-
-            if track.extra_tracks:
-                for extra_track in track.extra_tracks:
-                    new_track = Track(name=extra_track.name)
-                    self.project.add(new_track)
-                    source = Source(file=str(extra_track.file_path))
-                    file_path = Path(extra_track.file_path)
-                    output_audio_path = output_dir / file_path.name
-                    if not output_audio_path.exists():
-                        with open(file_path, 'rb') as src_file, open(output_audio_path, 'wb') as dst_file:
-                            dst_file.write(src_file.read())
-                    item = Item(
-                        source,
-                        position=current_position+extra_track.timestamp_seconds,
-                        length=extra_track.duration_seconds
-                    )
-                    new_track.add(item)
-                
-            midi_file_paths = midi_files.get(track.name, {})
-            for effect_type, midi_file_path in midi_file_paths.items():
-                source = Source(file=str(midi_file_path["file_path"]))
-                item = Item(
-                    source,
+                self.stager.stage(Path(track.file_path))
+            for extra_track in track.extra_tracks:
+                self.stager.stage(Path(extra_track.file_path))
+
+    def add_audio_track(self, track: CompiledAudioTrack, midi_file_paths: dict[str, dict]) -> None:
+        current_position = self.current_position
+        if track.file_path:
+            self.writer.add_item(
+                self.tracks["audio"],
+                str(track.file_path),
+                position=current_position,
+                length=track.duration
+            )
+
+        for extra_track in track.extra_tracks:
+            new_track = self.writer.add_track(extra_track.name)
+            self.writer.add_item(
+                new_track,
+                str(extra_track.file_path),
+                position=current_position+extra_track.timestamp,
+                length=extra_track.duration
+            )
+
+        for effect_type, midi_file_path in midi_file_paths.items():
+            effect_track = self.tracks.get(effect_type)
+            if effect_track is not None:
+                self.writer.add_item(
+                    effect_track,
+                    str(midi_file_path["file_path"]),
                     position=current_position,
                     length=midi_file_path["duration"]
                 )
-                effect_track = tracks.get(effect_type)
-                if effect_track:
-                    effect_track.add(item)
-            
-            self.project.props.append(marker(track_index, current_position, track.name))
-            track_index += 1
-            current_position += track.duration_seconds
+
+        self.writer.add_marker(self.track_index, current_position, track.name)
+        self.track_index += 1
+        self.current_position += track.duration
 
     def save_project(self, project_file_path: Path) -> None:
-        self.project.write(project_file_path)
\ No newline at end of file
+        if self.stager is not None:
+            with profiler.stage("media_staging"):
+                self.staged_media = self.stager.wait()
+            profiler.count("media_staging", bytes_written=sum(
+                staged.size for staged in self.staged_media if staged.method != "skipped"
+            ))
+        with profiler.stage("rpp_write"):
+            self._write_project(project_file_path)
+        if profiler.enabled:
+            profiler.count("rpp_write", bytes_written=project_file_path.stat().st_size)
+
+    def _write_project(self, project_file_path: Path) -> None:
+        if self.manifest is None:
+            with open(project_file_path, "w", encoding="utf-8") as file:
+                file.writelines(self.writer.chunks())
+            return
+        temporary_path = project_file_path.with_name(f".{project_file_path.name}.tmp")
+        digest = new_digest()
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            for chunk in self.writer.chunks():
+                file.write(chunk)
+                digest.update(chunk.encode("utf-8"))
+        digest = digest.hexdigest()
+        fresh = self.manifest.is_fresh("project", project_file_path.name, digest, project_file_path)
+        self.manifest.record("project", project_file_path.name, digest)
+        if fresh:
+            temporary_path.unlink()
+        else:
+            os.replace(temporary_path, project_file_path)
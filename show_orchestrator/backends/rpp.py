@@ -0,0 +1,91 @@
+from pathlib import Path
+from tempfile import SpooledTemporaryFile
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    from reathon.nodes import Track
+
+
+SPOOL_MAX_SIZE = 1 << 20
+SOURCE_TYPES = {
+    ".wav": "WAVE",
+    ".wave": "WAVE",
+    ".aiff": "WAVE",
+    ".aif": "WAVE",
+    ".mp3": "MP3",
+    ".ogg": "VORBIS",
+    ".flac": "FLAC",
+}
+
+
+def format_value(value: object) -> str:
+    if isinstance(value, (str, Path)):
+        return f'"{value}"'
+    return f"{value}"
+
+
+class RppWriter:
+
+    def __init__(self) -> None:
+        self.markers = []
+        self.tracks: list[SpooledTemporaryFile] = []
+
+    def add_track(self, name: str) -> int:
+        spool = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, mode="w+", encoding="utf-8")
+        spool.write(f"<TRACK\nNAME {format_value(name)}\n")
+        self.tracks.append(spool)
+        return len(self.tracks) - 1
+
+    def add_item(self, track: int, file_path: str, position: float, length: float) -> None:
+        source_type = SOURCE_TYPES.get(Path(file_path).suffix)
+        source_name = f"SOURCE {source_type}" if source_type else "SOURCE SECTION"
+        self.tracks[track].write(
+            f"<ITEM\nPOSITION {format_value(position)}\nLENGTH {format_value(length)}\n"
+            f"<{source_name}\nFILE {format_value(file_path)}\n>\n>\n"
+        )
+
+    def add_marker(self, index: int, time: float, name: str) -> None:
+        self.markers.append(f'MARKER {index} {time} "{name}" 0 0 1 B\n')
+
+    def chunks(self) -> Iterator[str]:
+        yield "<REAPER_PROJECT\n"
+        yield "".join(self.markers)
+        for spool in self.tracks:
+            spool.write(">\n")
+            spool.seek(0)
+            while chunk := spool.read(SPOOL_MAX_SIZE):
+                yield chunk
+            spool.close()
+        yield ">\n"
+
+
+class ReathonWriter:
+
+    def __init__(self) -> None:
+        from reathon.nodes import Project
+
+        self.project = Project()
+        self.tracks: list["Track"] = []
+
+    def add_track(self, name: str) -> int:
+        from reathon.nodes import Track
+
+        track = Track(name=name)
+        self.project.add(track)
+        self.tracks.append(track)
+        return len(self.tracks) - 1
+
+    def add_item(self, track: int, file_path: str, position: float, length: float) -> None:
+        from reathon.nodes import Item, Source
+
+        self.tracks[track].add(Item(Source(file=file_path), position=position, length=length))
+
+    def add_marker(self, index: int, time: float, name: str) -> None:
+        from reathon.helper import marker
+
+        self.project.props.append(marker(index, time, name))
+
+    def chunks(self) -> Iterator[str]:
+        self.project.string = ""
+        self.project.traverse(self.project)
+        yield self.project.string
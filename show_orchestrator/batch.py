@@ -0,0 +1,64 @@
+import glob
+from pathlib import Path
+
+from pydantic import BaseModel
+
+
+SHOW_SUFFIXES = {".yaml", ".yml", ".csv"}
+GLOB_CHARACTERS = set("*?[")
+
+
+class ShowResult(BaseModel):
+    file: Path
+    output_dir: Path
+    seconds: float
+    error: str | None = None
+
+
+def find_show_files(patterns: list[str]) -> list[Path]:
+    files: dict[Path, Path] = {}
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            matches = sorted(child for child in path.iterdir() if child.suffix in SHOW_SUFFIXES)
+        elif GLOB_CHARACTERS & set(pattern):
+            matches = sorted(
+                Path(match) for match in glob.glob(pattern, recursive=True) if Path(match).suffix in SHOW_SUFFIXES
+            )
+        else:
+            matches = [path]
+        for match in matches:
+            files.setdefault(match.resolve(), match)
+    return list(files.values())
+
+
+def get_output_dirs(files: list[Path], output_dir: Path) -> list[Path]:
+    used = set()
+    output_dirs = []
+    for file in files:
+        name = file.stem
+        if name in used:
+            name = f"{file.stem}_{file.suffix[1:]}"
+        index = 2
+        while name in used:
+            name = f"{file.stem}_{file.suffix[1:]}_{index}"
+            index += 1
+        used.add(name)
+        output_dirs.append(output_dir / name)
+    return output_dirs
+
+
+def format_summary(results: list[ShowResult], wall_time: float) -> str:
+    width = max((len(str(result.file)) for result in results), default=0)
+    lines = []
+    for result in results:
+        status = "ok" if result.error is None else "FAILED"
+        lines.append(f"{str(result.file):<{width}}  {status:<6}{result.seconds:>9.2f} s  {result.output_dir}")
+        if result.error is not None:
+            lines.extend(f"    {line}" for line in result.error.splitlines())
+    failed = sum(result.error is not None for result in results)
+    lines.append(
+        f"{len(results) - failed} built, {failed} failed in {wall_time:.2f} s "
+        f"({sum(result.seconds for result in results):.2f} s of show time)"
+    )
+    return "\n".join(lines)
@@ -0,0 +1,114 @@
+from array import array
+
+from show_orchestrator.models import AudioTrack, Effect, EffectType, Show, to_seconds
+
+
+class EventTable:
+    __slots__ = ("start", "end", "effect_index", "note", "channel")
+
+    def __init__(self) -> None:
+        self.start = array('d')
+        self.end = array('d')
+        self.effect_index = array('l')
+        self.note = array('B')
+        self.channel = array('B')
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def append(self, start: float, end: float, effect_index: int, note: int, channel: int) -> None:
+        self.start.append(start)
+        self.end.append(end)
+        self.effect_index.append(effect_index)
+        self.note.append(note)
+        self.channel.append(channel)
+
+
+class CompiledExtraTrack:
+    __slots__ = ("name", "file_path", "timestamp", "duration")
+
+    def __init__(self, name: str, file_path: str, timestamp: float, duration: float) -> None:
+        self.name = name
+        self.file_path = file_path
+        self.timestamp = timestamp
+        self.duration = duration
+
+
+class CompiledAudioTrack:
+    __slots__ = ("name", "file_path", "duration", "extra_tracks", "events")
+
+    def __init__(self, name: str, file_path: str | None, duration: float) -> None:
+        self.name = name
+        self.file_path = file_path
+        self.duration = duration
+        self.extra_tracks: list[CompiledExtraTrack] = []
+        self.events: dict[EffectType, EventTable] = {}
+
+    def with_events(self, events: dict[EffectType, EventTable]) -> "CompiledAudioTrack":
+        compiled_track = CompiledAudioTrack(self.name, self.file_path, self.duration)
+        compiled_track.extra_tracks = self.extra_tracks
+        compiled_track.events = events
+        return compiled_track
+
+
+class CompiledShow:
+
+    def __init__(self, effect_types: list[EffectType], effects: list[Effect]) -> None:
+        self.effect_types = effect_types
+        self.effects = effects
+        self.audio_tracks: list[CompiledAudioTrack] = []
+        self.source_tracks: list[AudioTrack] = []
+        self.compiled_tracks: list[CompiledAudioTrack] = []
+        self.settings: tuple = ()
+
+
+def compile_show(show: Show, effect_mapping: dict[str, Effect] | None = None, default_channel: int = 0,
+                 default_duration: float = 0.1, previous: CompiledShow | None = None) -> CompiledShow:
+    if effect_mapping is None:
+        effect_mapping = {effect.id: effect for effect_list in show.effects.values() for effect in effect_list}
+    effects = list(effect_mapping.values())
+    resolved = {
+        effect.id: (index, effect.note, effect.channel or default_channel)
+        for index, effect in enumerate(effects)
+        if effect.note is not None
+    }
+    compiled_show = CompiledShow(list(show.effects), effects)
+    compiled_show.settings = (resolved, default_duration)
+    reusable = {}
+    if previous is not None and previous.settings == compiled_show.settings:
+        reusable = {
+            id(source_track): compiled_track
+            for source_track, compiled_track in zip(previous.source_tracks, previous.compiled_tracks)
+        }
+    for audio_track in show.audio_tracks:
+        compiled_show.source_tracks.append(audio_track)
+        compiled_track = reusable.get(id(audio_track))
+        if compiled_track is not None:
+            compiled_show.compiled_tracks.append(compiled_track)
+            compiled_show.audio_tracks.append(compiled_track)
+            continue
+        compiled_track = CompiledAudioTrack(
+            audio_track.name,
+            audio_track.file_path,
+            to_seconds(audio_track.duration)
+        )
+        for extra_track in audio_track.extra_tracks or []:
+            compiled_track.extra_tracks.append(CompiledExtraTrack(
+                extra_track.name,
+                extra_track.file_path,
+                to_seconds(extra_track.timestamp),
+                to_seconds(extra_track.duration)
+            ))
+        for effect_type, events in audio_track.events.items():
+            table = EventTable()
+            for event in events:
+                effect = resolved.get(event.effect_id)
+                if effect is None:
+                    continue
+                start = to_seconds(event.timestamp)
+                duration = to_seconds(event.duration) or default_duration
+                table.append(start, start + duration, *effect)
+            compiled_track.events[effect_type] = table
+        compiled_show.compiled_tracks.append(compiled_track)
+        compiled_show.audio_tracks.append(compiled_track)
+    return compiled_show
@@ -0,0 +1,69 @@
+from show_orchestrator.models import Effect, EffectType
+
+
+FIELD_ALIASES = {"note": "note", "n": "note", "channel": "channel", "ch": "channel", "type": "type", "t": "type"}
+
+
+class EffectIndex:
+
+    def __init__(self, effects: dict[EffectType, list[Effect]] | dict[EffectType, dict[str, Effect]]) -> None:
+        self.entries: list[tuple[EffectType, Effect]] = []
+        self.keys: list[str] = []
+        for effect_type, type_effects in effects.items():
+            for effect in (type_effects.values() if isinstance(type_effects, dict) else type_effects):
+                self.entries.append((effect_type, effect))
+                self.keys.append(f"{effect.id}\0{effect.name}\0{effect.note}\0{effect.channel}".lower())
+        self.last_terms: list[tuple[str | None, str]] = []
+        self.last_matches = list(range(len(self.entries)))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def search(self, query: str) -> list[int]:
+        terms = parse_query(query)
+        if _refines(self.last_terms, terms):
+            candidates = self.last_matches
+        else:
+            candidates = range(len(self.entries))
+        self.last_terms = terms
+        self.last_matches = [index for index in candidates if self._matches(index, terms)]
+        return self.last_matches
+
+    def _matches(self, index: int, terms: list[tuple[str | None, str]]) -> bool:
+        effect_type, effect = self.entries[index]
+        key = self.keys[index]
+        for field, value in terms:
+            if field is None:
+                if value not in key:
+                    return False
+            elif field == "type":
+                if not effect_type.value.startswith(value):
+                    return False
+            elif str(getattr(effect, field)) != value:
+                return False
+        return True
+
+
+def parse_query(query: str) -> list[tuple[str | None, str]]:
+    terms = []
+    for term in query.lower().split():
+        field, separator, value = term.partition(":")
+        if separator and field in FIELD_ALIASES and value:
+            terms.append((FIELD_ALIASES[field], value))
+        else:
+            terms.append((None, term))
+    return terms
+
+
+def _implies(new: tuple[str | None, str], old: tuple[str | None, str]) -> bool:
+    if new == old:
+        return True
+    if new[0] != old[0]:
+        return False
+    if new[0] is None:
+        return old[1] in new[1]
+    return new[0] == "type" and new[1].startswith(old[1])
+
+
+def _refines(old_terms: list[tuple[str | None, str]], new_terms: list[tuple[str | None, str]]) -> bool:
+    return all(any(_implies(new, old) for new in new_terms) for old in old_terms)
@@ -1,104 +1,249 @@
-from collections import defaultdict
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
+from typing import Iterator, NamedTuple
 
-import mido
+from show_orchestrator.allocator import NoteAllocator
+from show_orchestrator.compiler import CompiledShow, EventTable, compile_show
+from show_orchestrator.instrumentation import profiler
+from show_orchestrator.intervals import Collision, IntervalIndex, merge_collisions
+from show_orchestrator.layouts import COMBINED_MIDI_KEY, CollisionPolicy, MidiLayout
+from show_orchestrator.manifest import BuildManifest, hash_event_table, new_digest
+from show_orchestrator.models import Effect, Show
+from show_orchestrator.optimizer import OptimizerStats, optimize_event_table, order_note_offs_first
+from show_orchestrator.smf import (
+    DEFAULT_TICKS_PER_BEAT, NOTE_OFF, NOTE_ON, bpm_to_tempo, encode_track, seconds_to_ticks, write_midi_file
+)
 
-from show_orchestrator.models import Event, MidiEvent, Show
+
+def get_sorted_midi_events(table: EventTable) -> tuple[list[int], array]:
+    times = array('d', bytes(16 * len(table)))
+    times[0::2] = table.start
+    times[1::2] = table.end
+    return sorted(range(len(times)), key=times.__getitem__), times
+
+
+class MidiJob(NamedTuple):
+    track_name: str
+    key: str
+    parts: list[tuple[EventTable, float]]
+    midi_file_path: Path
+    midi_type: int
+
+
+def encode_event_table(table: EventTable, ticks_per_beat: int, tempo: int,
+                       offset: float = 0.0, note_offs_first: bool = False) -> tuple[bytearray, float]:
+    order, times = get_sorted_midi_events(table)
+    sorted_times = array('d', [times[index] + offset for index in order])
+    statuses = array('B', [
+        (NOTE_OFF if index & 1 else NOTE_ON) | table.channel[index >> 1] for index in order
+    ])
+    notes = array('B', [table.note[index >> 1] for index in order])
+    ticks = seconds_to_ticks(sorted_times, ticks_per_beat, tempo)
+    if note_offs_first:
+        order_note_offs_first(ticks, statuses, notes, NOTE_OFF)
+    return encode_track(ticks, statuses, notes), sorted_times[-1] if sorted_times else offset
+
+
+def render_midi_file(parts: list[tuple[EventTable, float]], tempo: int, midi_file_path: Path,
+                     midi_type: int = 0, note_offs_first: bool = False) -> float:
+    tracks = []
+    ends = []
+    for table, offset in parts:
+        track, end = encode_event_table(table, DEFAULT_TICKS_PER_BEAT, tempo, offset, note_offs_first)
+        tracks.append(track)
+        ends.append(end)
+    write_midi_file(midi_file_path, tracks, DEFAULT_TICKS_PER_BEAT, midi_type)
+    return max(ends)
 
 
 class MidiGenerator:
     
-    def __init__(self, bpm: int = 120) -> None:
-        self.files = {}
+    def __init__(self, bpm: int = 120, jobs: int = 1, manifest: BuildManifest | None = None,
+                 note_allocator: NoteAllocator | None = None, layout: MidiLayout = MidiLayout.PER_TRACK,
+                 collisions: CollisionPolicy = CollisionPolicy.FLAG, optimize: bool = False,
+                 min_retrigger_gap: float = 0.0) -> None:
         self.bpm = bpm
+        self.jobs = jobs
+        self.layout = MidiLayout(layout)
+        self.collision_policy = CollisionPolicy(collisions)
+        self.collisions: dict[str, list[Collision]] = {}
+        self.optimize = optimize
+        self.min_retrigger_gap = min_retrigger_gap
+        self.optimizer_stats = OptimizerStats()
+        self.manifest = manifest
         self.default_channel = 0
-        self.tempo = mido.bpm2tempo(bpm)
-        self.used_notes_per_channel = defaultdict(set)
-
-    def _create_midi_file(self, name: str) -> tuple[mido.MidiFile, mido.MidiTrack]:
-        mid = mido.MidiFile(type=0)
-        track = mido.MidiTrack()
-        mid.tracks.append(track)
-        self.files[name] = mid
-        return mid, track
-
-    def _get_effects_by_id(self, effects: dict) -> dict[str, int]:
-        effect_mapping = {}
-        effects_without_note = []
-        for _, effect_list in effects.items():
-            for effect in effect_list:
-                note = effect.note
-                channel = effect.channel if effect.channel is not None else self.default_channel
-                if note is None:
-                    effects_without_note.append(effect)
-                    continue
-                self.used_notes_per_channel[channel].add(note)
-                effect_mapping[effect.id] = effect
-        for effect in effects_without_note:
-            note = 0
-            channel = effect.channel if effect.channel is not None else self.default_channel
-            used_notes = self.used_notes_per_channel[channel]
-            while note in used_notes:
-                note += 1
-            effect.note = note
-            self.used_notes_per_channel[channel].add(note)
-            effect_mapping[effect.id] = effect
-        return effect_mapping
+        self.tempo = bpm_to_tempo(bpm)
+        self.note_allocator = note_allocator or NoteAllocator(self.default_channel)
+        self.compiled_show = None
+
+    def _get_effects_by_id(self, effects: dict) -> dict[str, Effect]:
+        return self.note_allocator.assign_effects(effects)
     
-    def _get_midi_events_from_events(self, events: list[Event], effect_mapping: dict) -> list[MidiEvent]:
-        midi_events = []
-        for event in events:
-            timestamp = event.timestamp_seconds
-            duration = event.duration_seconds or 0.1
-            effect = effect_mapping.get(event.effect_id)
-            if effect is None:
+    def compile_show(self, show_data: Show) -> CompiledShow:
+        with profiler.stage("note_mapping"):
+            effect_mapping = self._get_effects_by_id(show_data.effects)
+        with profiler.stage("compile"):
+            self.compiled_show = compile_show(
+                show_data, effect_mapping, self.default_channel, previous=self.compiled_show
+            )
+        if self.collision_policy != CollisionPolicy.IGNORE:
+            with profiler.stage("collisions"):
+                self._find_collisions(self.compiled_show)
+        if self.optimize:
+            with profiler.stage("optimize"):
+                self._optimize(self.compiled_show)
+        return self.compiled_show
+
+    def _find_collisions(self, compiled_show: CompiledShow) -> None:
+        self.collisions = {}
+        for index, audio_track in enumerate(compiled_show.audio_tracks):
+            collisions = IntervalIndex.from_audio_track(audio_track).collisions()
+            if not collisions:
                 continue
-            channel = effect.channel or self.default_channel
+            self.collisions[audio_track.name] = collisions
+            if self.collision_policy == CollisionPolicy.MERGE:
+                events = dict(audio_track.events)
+                for effect_type in {collision.second.effect_type for collision in collisions}:
+                    events[effect_type] = merge_collisions(events[effect_type])
+                compiled_show.audio_tracks[index] = audio_track.with_events(events)
 
-            note_on_event = MidiEvent(
-                timestamp=timestamp,
-                message="note_on",
-                channel=channel,
-                note=effect.note
-            )
-            midi_events.append(note_on_event)
-            note_off_event = MidiEvent(
-                timestamp=timestamp + duration,
-                message="note_off",
-                channel=channel,
-                note=effect.note
-            )
-            midi_events.append(note_off_event)
-        return midi_events
+    def _optimize(self, compiled_show: CompiledShow) -> None:
+        self.optimizer_stats = OptimizerStats()
+        min_length = self.tempo * 1e-6 / DEFAULT_TICKS_PER_BEAT / 2
+        events = 0
+        for index, audio_track in enumerate(compiled_show.audio_tracks):
+            optimized = {}
+            for effect_type, table in audio_track.events.items():
+                events += len(table)
+                optimized[effect_type], stats = optimize_event_table(table, self.min_retrigger_gap, min_length)
+                self.optimizer_stats.add(stats)
+            compiled_show.audio_tracks[index] = audio_track.with_events(optimized)
+        profiler.count("optimize", events=events, messages=self.optimizer_stats.removed_messages)
+
+    def _get_midi_jobs(self, compiled_show: CompiledShow, output_dir: Path) -> list[MidiJob]:
+        if self.layout == MidiLayout.PER_TRACK:
+            return [
+                MidiJob(audio_track.name, effect_type, [(table, 0.0)],
+                        output_dir / f"{audio_track.name}_{effect_type}.mid", 0)
+                for audio_track in compiled_show.audio_tracks
+                for effect_type, table in audio_track.events.items()
+                if len(table)
+            ]
+        if self.layout == MidiLayout.PER_SONG:
+            return [
+                MidiJob(audio_track.name, COMBINED_MIDI_KEY, [(table, 0.0) for table in audio_track.events.values()],
+                        output_dir / f"{audio_track.name}.mid", 1)
+                for audio_track in compiled_show.audio_tracks
+                if any(len(table) for table in audio_track.events.values())
+            ]
+        if not compiled_show.audio_tracks:
+            return []
+        positions = []
+        current_position = 0
+        for audio_track in compiled_show.audio_tracks:
+            positions.append(current_position)
+            current_position += audio_track.duration
+        jobs = []
+        for effect_type in compiled_show.effect_types:
+            parts = [
+                (audio_track.events.get(effect_type, EventTable()), position)
+                for audio_track, position in zip(compiled_show.audio_tracks, positions)
+            ]
+            if any(len(table) for table, _ in parts):
+                jobs.append(MidiJob(compiled_show.audio_tracks[0].name, effect_type, parts,
+                                    output_dir / f"show_{effect_type}.mid", 1))
+        return jobs
+
+    def _get_render_settings(self) -> dict[str, bool]:
+        return {"note_offs_first": True} if self.optimize else {}
+
+    def _hash_midi_job(self, job: MidiJob) -> str:
+        if len(job.parts) == 1 and job.midi_type == 0:
+            table, _ = job.parts[0]
+            return hash_event_table(table, bpm=self.bpm, tempo=self.tempo, ticks_per_beat=DEFAULT_TICKS_PER_BEAT,
+                                    **self._get_render_settings())
+        digest = new_digest()
+        for table, offset in job.parts:
+            digest.update(hash_event_table(
+                table, bpm=self.bpm, tempo=self.tempo, ticks_per_beat=DEFAULT_TICKS_PER_BEAT,
+                offset=offset, midi_type=job.midi_type, **self._get_render_settings()
+            ).encode())
+        return digest.hexdigest()
 
     def generate_midi_files(self, show_data: Show, output_dir: Path) -> dict[str, Path]:
-        midi_file_paths = {}
-        effect_mapping = self._get_effects_by_id(show_data.effects)
-        for audio_track in show_data.audio_tracks:
-            track_midi_files = {}
-            for effect_type, events in audio_track.events.items():
-                mid, track = self._create_midi_file(f"{audio_track.name}_{effect_type}")
-                midi_events = self._get_midi_events_from_events(events, effect_mapping)
-                midi_events.sort(key=lambda e: e.timestamp)
+        compiled_show = self.compile_show(show_data)
+        return dict(self.iter_midi_files(compiled_show, output_dir))
 
-                current_time = 0
-                if not midi_events:
+    def has_combined_midi(self, compiled_show: CompiledShow) -> bool:
+        return self.layout == MidiLayout.PER_SONG and any(
+            len(table) for audio_track in compiled_show.audio_tracks for table in audio_track.events.values()
+        )
+
+    def iter_midi_files(self, compiled_show: CompiledShow, output_dir: Path) -> Iterator[tuple[str, dict]]:
+        jobs = self._get_midi_jobs(compiled_show, output_dir)
+        durations = {}
+        digests = {}
+        pending = []
+        for job in jobs:
+            if self.manifest is None:
+                pending.append(job)
+                continue
+            midi_file_path = job.midi_file_path
+            digest = self._hash_midi_job(job)
+            digests[midi_file_path] = digest
+            if self.manifest.is_fresh("midi", midi_file_path.name, digest, midi_file_path):
+                durations[midi_file_path] = self.manifest.get("midi", midi_file_path.name)["duration"]
+            else:
+                pending.append(job)
+
+        track_jobs = {audio_track.name: [] for audio_track in compiled_show.audio_tracks}
+        for job in jobs:
+            track_jobs[job.track_name].append(job)
+        with ProcessPoolExecutor(max_workers=self.jobs) if self.jobs > 1 else nullcontext() as executor:
+            with profiler.stage("midi_render"):
+                if executor is not None:
+                    rendered = executor.map(
+                        render_midi_file,
+                        [job.parts for job in pending],
+                        [self.tempo] * len(pending),
+                        [job.midi_file_path for job in pending],
+                        [job.midi_type for job in pending],
+                        [self.optimize] * len(pending),
+                        chunksize=max(1, len(pending) // (self.jobs * 4))
+                    )
+                else:
+                    rendered = (
+                        render_midi_file(job.parts, self.tempo, job.midi_file_path, job.midi_type, self.optimize)
+                        for job in pending
+                    )
+            pending_paths = {job.midi_file_path for job in pending}
+            track_midi_files = {}
+            for audio_track in compiled_show.audio_tracks:
+                track_name = audio_track.name
+                if track_name in track_midi_files:
+                    yield track_name, track_midi_files[track_name]
                     continue
-                for event in midi_events:
-                    delta_time = event.timestamp - current_time
-                    midi_time = mido.second2tick(delta_time, mid.ticks_per_beat, tempo=self.tempo)
-                    midi_message = mido.Message(event.message, 
-                                                note=event.note, 
-                                                channel=event.channel, 
-                                                time=midi_time)
-                    track.append(midi_message)
-                    current_time = event.timestamp
-
-                midi_file_path = output_dir / f"{audio_track.name}_{effect_type}.mid"
-                mid.save(midi_file_path)
-                track_midi_files[effect_type] = {
-                    "file_path": midi_file_path,
-                    "duration": current_time
-                }
-            midi_file_paths[audio_track.name] = track_midi_files
-        return midi_file_paths
\ No newline at end of file
+                midi_file_paths = track_midi_files[track_name] = {}
+                with profiler.stage("midi_render"):
+                    for job in track_jobs[track_name]:
+                        midi_file_path = job.midi_file_path
+                        if midi_file_path in pending_paths:
+                            durations[midi_file_path] = next(rendered)
+                        midi_file_paths[job.key] = {
+                            "file_path": midi_file_path,
+                            "duration": durations[midi_file_path]
+                        }
+                        if self.manifest is not None:
+                            self.manifest.record("midi", midi_file_path.name, digests[midi_file_path],
+                                                 duration=durations[midi_file_path])
+                yield track_name, midi_file_paths
+        if profiler.enabled:
+            events = sum(len(table) for job in pending for table, _ in job.parts)
+            profiler.count(
+                "midi_render",
+                events=events,
+                messages=2 * events,
+                bytes_written=sum(job.midi_file_path.stat().st_size for job in pending)
+            )
@@ -0,0 +1,268 @@
+import http.client
+import json
+import queue
+import re
+import select
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import groupby
+from pathlib import Path
+from typing import Callable
+from urllib.parse import urlsplit
+
+from pydantic import BaseModel
+
+from show_orchestrator.compiler import CompiledShow
+from show_orchestrator.models import EffectType
+from show_orchestrator.playback import PlaybackStats, StatsRecorder
+
+
+ENTITY_ID_REGEX = re.compile(r"[a-z0-9_]+\.[a-z0-9_]+")
+DEFAULT_SERVICE = "homeassistant.turn_on"
+SERVICE_MAP_VERSION = 1
+
+
+class ServiceCall(BaseModel):
+    time: float
+    service: str
+    data: dict = {}
+
+    @property
+    def domain(self) -> str:
+        return self.service.split(".", 1)[0]
+
+    @property
+    def name(self) -> str:
+        return self.service.split(".", 1)[1]
+
+
+class CallResult(BaseModel):
+    time: float
+    service: str
+    data: dict
+    status: int | None = None
+    latency: float
+    lateness: float
+    error: str | None = None
+
+
+def load_service_map(file_path: Path) -> dict[str, dict]:
+    with open(file_path, 'r', encoding='utf-8') as file:
+        data = json.load(file)
+    if data.get("version") != SERVICE_MAP_VERSION:
+        raise ValueError(f"Unsupported service map version in {file_path}")
+    return data.get("effects", {})
+
+
+def get_effect_calls(effect_id: str, service_map: dict[str, dict]) -> dict[str, dict] | None:
+    calls = service_map.get(effect_id)
+    if calls is not None:
+        return calls
+    if ENTITY_ID_REGEX.fullmatch(effect_id):
+        return {"start": {"service": DEFAULT_SERVICE, "data": {"entity_id": effect_id}}}
+    return None
+
+
+def merge_service_calls(calls: list[ServiceCall]) -> list[ServiceCall]:
+    merged: dict[tuple, ServiceCall] = {}
+    for call in calls:
+        entity_ids = call.data.get("entity_id")
+        if entity_ids is None:
+            key = (call.time, call.service, json.dumps(call.data, sort_keys=True))
+            merged.setdefault(key, call)
+            continue
+        if isinstance(entity_ids, str):
+            entity_ids = [entity_ids]
+        rest = {name: value for name, value in call.data.items() if name != "entity_id"}
+        key = (call.time, call.service, json.dumps(rest, sort_keys=True), "entity_id")
+        existing = merged.get(key)
+        if existing is None:
+            merged[key] = ServiceCall(time=call.time, service=call.service, data={**rest, "entity_id": list(entity_ids)})
+            continue
+        existing.data["entity_id"].extend(
+            entity_id for entity_id in entity_ids if entity_id not in existing.data["entity_id"]
+        )
+    for call in merged.values():
+        entity_ids = call.data.get("entity_id")
+        if isinstance(entity_ids, list) and len(entity_ids) == 1:
+            call.data["entity_id"] = entity_ids[0]
+    return sorted(merged.values(), key=lambda call: call.time)
+
+
+def get_service_calls(compiled_show: CompiledShow, service_map: dict[str, dict] | None = None,
+                      batch: bool = True) -> tuple[list[ServiceCall], set[str]]:
+    service_map = service_map or {}
+    calls = []
+    unmapped = set()
+    current_position = 0
+    for audio_track in compiled_show.audio_tracks:
+        table = audio_track.events.get(EffectType.HOMEASSISTANT)
+        for row in range(len(table) if table is not None else 0):
+            effect_id = compiled_show.effects[table.effect_index[row]].id
+            effect_calls = get_effect_calls(effect_id, service_map)
+            if effect_calls is None:
+                unmapped.add(effect_id)
+                continue
+            for moment, timestamp in (("start", table.start[row]), ("end", table.end[row])):
+                call = effect_calls.get(moment)
+                if call is not None:
+                    calls.append(ServiceCall(
+                        time=current_position + timestamp, service=call["service"], data=dict(call.get("data", {}))
+                    ))
+        current_position += audio_track.duration
+    calls.sort(key=lambda call: call.time)
+    return (merge_service_calls(calls) if batch else calls), unmapped
+
+
+def _is_dropped(connection: http.client.HTTPConnection) -> bool:
+    if connection.sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([connection.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+class ConnectionPool:
+
+    def __init__(self, base_url: str, size: int = 4, timeout: float = 5.0) -> None:
+        parts = urlsplit(base_url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip("/")
+        self.size = size
+        self.timeout = timeout
+        self.idle: queue.LifoQueue[http.client.HTTPConnection] = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+        self.lock = threading.Lock()
+        self.opened = 0
+
+    def _acquire(self) -> tuple[http.client.HTTPConnection, bool]:
+        while True:
+            try:
+                connection = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            if not _is_dropped(connection):
+                return connection, True
+            connection.close()
+        with self.lock:
+            self.opened += 1
+        return self.connection_class(self.host, self.port, timeout=self.timeout), False
+
+    def request(self, method: str, path: str, body: bytes | None = None,
+                headers: dict[str, str] | None = None) -> tuple[int, bytes]:
+        with self.slots:
+            connection, reused = self._acquire()
+            while True:
+                try:
+                    connection.request(method, f"{self.prefix}{path}", body=body, headers=headers or {})
+                except (BrokenPipeError, ConnectionResetError):
+                    connection.close()
+                    if not reused:
+                        raise
+                    connection, reused = self._acquire()
+                    continue
+                except (http.client.HTTPException, OSError):
+                    connection.close()
+                    raise
+                try:
+                    response = connection.getresponse()
+                    data = response.read()
+                except (http.client.HTTPException, OSError):
+                    connection.close()
+                    raise
+                if response.will_close:
+                    connection.close()
+                else:
+                    self.idle.put(connection)
+                return response.status, data
+
+    def close(self) -> None:
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class HomeAssistantClient:
+
+    def __init__(self, base_url: str, token: str | None = None, pool_size: int = 4, timeout: float = 5.0) -> None:
+        self.pool = ConnectionPool(base_url, pool_size, timeout)
+        self.headers = {"Content-Type": "application/json"}
+        if token:
+            self.headers["Authorization"] = f"Bearer {token}"
+
+    def call_service(self, call: ServiceCall) -> int:
+        status, _ = self.pool.request(
+            "POST", f"/api/services/{call.domain}/{call.name}", json.dumps(call.data).encode("utf-8"), self.headers
+        )
+        return status
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+class HomeAssistantDispatcher:
+
+    def __init__(self, calls: list[ServiceCall], client: HomeAssistantClient,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep) -> None:
+        self.client = client
+        self.clock = clock
+        self.sleep = sleep
+        self.batches = [(timestamp, list(batch)) for timestamp, batch in groupby(calls, key=lambda call: call.time)]
+        self.results: list[CallResult] = []
+        self.stats = StatsRecorder()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+    def play(self, position: float = 0.0) -> PlaybackStats:
+        self.stop_event.clear()
+        self.results = []
+        self.stats = StatsRecorder()
+        start_time = self.clock() - position
+        pending: list[Future] = []
+        with ThreadPoolExecutor(max_workers=self.client.pool.size, thread_name_prefix="homeassistant") as executor:
+            for timestamp, batch in self.batches:
+                if timestamp < position:
+                    continue
+                target = start_time + timestamp
+                while not self.stop_event.is_set() and (remaining := target - self.clock()) > 0:
+                    self.sleep(min(remaining, 0.1))
+                if self.stop_event.is_set():
+                    break
+                pending.extend(executor.submit(self._send, call, target) for call in batch)
+            for future in pending:
+                future.result()
+        self.results.sort(key=lambda result: result.time)
+        return self.stats.summary()
+
+    def _send(self, call: ServiceCall, target: float) -> None:
+        before = self.clock()
+        status = None
+        error = None
+        try:
+            status = self.client.call_service(call)
+            if status >= 400:
+                error = f"HTTP {status}"
+        except (http.client.HTTPException, OSError) as exception:
+            error = str(exception) or type(exception).__name__
+        after = self.clock()
+        with self.lock:
+            self.stats.record(after - before, before - target)
+            self.results.append(CallResult(
+                time=call.time,
+                service=call.service,
+                data=call.data,
+                status=status,
+                latency=after - before,
+                lateness=before - target,
+                error=error
+            ))
@@ -0,0 +1,94 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Iterator
+
+from pydantic import BaseModel
+
+
+class StageStats(BaseModel):
+    name: str
+    wall_time: float = 0.0
+    calls: int = 0
+    events: int = 0
+    messages: int = 0
+    bytes_written: int = 0
+    peak_memory: int | None = None
+
+
+class Profiler:
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.trace_memory = False
+        self.stages: dict[str, StageStats] = {}
+
+    def enable(self, trace_memory: bool = False) -> None:
+        self.enabled = True
+        self.trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self) -> None:
+        self.enabled = False
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.trace_memory = False
+
+    def reset(self) -> None:
+        self.stages.clear()
+
+    def _get_stage(self, name: str) -> StageStats:
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats(name=name)
+        return stats
+
+    @contextmanager
+    def _measure(self, name: str) -> Iterator[StageStats]:
+        stats = self._get_stage(name)
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats.wall_time += time.perf_counter() - start
+            stats.calls += 1
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                stats.peak_memory = max(stats.peak_memory or 0, peak)
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return nullcontext()
+        return self._measure(name)
+
+    def count(self, name: str, events: int = 0, messages: int = 0, bytes_written: int = 0) -> None:
+        if not self.enabled:
+            return
+        stats = self._get_stage(name)
+        stats.events += events
+        stats.messages += messages
+        stats.bytes_written += bytes_written
+
+    def format_table(self) -> str:
+        lines = [
+            f"{'stage':<16}{'wall ms':>10}{'calls':>8}{'events':>10}{'messages':>10}{'bytes':>12}{'peak MiB':>10}"
+        ]
+        for stats in self.stages.values():
+            peak = "-" if stats.peak_memory is None else f"{stats.peak_memory / 1024 / 1024:.1f}"
+            lines.append(
+                f"{stats.name:<16}{stats.wall_time * 1000:>10.1f}{stats.calls:>8}{stats.events:>10}"
+                f"{stats.messages:>10}{stats.bytes_written:>12}{peak:>10}"
+            )
+        return "\n".join(lines)
+
+    def save(self, file_path: Path) -> None:
+        with open(file_path, "w", encoding="utf-8") as file:
+            json.dump([stats.model_dump() for stats in self.stages.values()], file, indent=2)
+
+
+profiler = Profiler()
@@ -0,0 +1,164 @@
+from bisect import bisect_right
+from math import inf, nextafter
+from operator import attrgetter
+from typing import NamedTuple
+
+from show_orchestrator.compiler import CompiledAudioTrack, EventTable
+from show_orchestrator.models import EffectType
+
+
+class Interval(NamedTuple):
+    start: float
+    end: float
+    effect_type: EffectType
+    row: int
+    effect_index: int
+    note: int
+    channel: int
+
+
+class Collision(NamedTuple):
+    first: Interval
+    second: Interval
+
+
+START = attrgetter("start")
+END = attrgetter("end")
+
+
+class IntervalNode(NamedTuple):
+    center: float
+    by_start: list[Interval]
+    by_end: list[Interval]
+    left: "IntervalNode | None"
+    right: "IntervalNode | None"
+
+
+def build_interval_tree(intervals: list[Interval]) -> IntervalNode | None:
+    if not intervals:
+        return None
+    middle = len(intervals) // 2
+    center = intervals[middle].start
+    split = bisect_right(intervals, center, middle, key=START)
+    left = [interval for interval in intervals[:split] if interval.end < center]
+    here = [interval for interval in intervals[:split] if interval.end >= center]
+    right = intervals[split:]
+    return IntervalNode(center, here, sorted(here, key=END, reverse=True),
+                        build_interval_tree(left), build_interval_tree(right))
+
+
+class IntervalIndex:
+
+    def __init__(self, tables: dict[EffectType, EventTable]) -> None:
+        self.tables = tables
+        self.intervals: list[Interval] | None = None
+        self.root: IntervalNode | None = None
+
+    @classmethod
+    def from_audio_track(cls, audio_track: CompiledAudioTrack) -> "IntervalIndex":
+        return cls(audio_track.events)
+
+    def __len__(self) -> int:
+        return sum(len(table) for table in self.tables.values())
+
+    def _build(self) -> list[Interval]:
+        if self.intervals is None:
+            self.intervals = sorted(
+                get_interval(effect_type, table, row)
+                for effect_type, table in self.tables.items()
+                for row in range(len(table))
+            )
+            self.root = build_interval_tree(self.intervals)
+        return self.intervals
+
+    def _query(self, after: float, before: float) -> list[Interval]:
+        self._build()
+        found = []
+        nodes = [self.root] if self.root is not None else []
+        while nodes:
+            node = nodes.pop()
+            if before <= node.center:
+                for interval in node.by_start:
+                    if interval.start >= before:
+                        break
+                    if interval.end > after:
+                        found.append(interval)
+                children = (node.left,)
+            elif after >= node.center:
+                for interval in node.by_end:
+                    if interval.end <= after:
+                        break
+                    if interval.start < before:
+                        found.append(interval)
+                children = (node.right,)
+            else:
+                found.extend(node.by_start)
+                children = (node.left, node.right)
+            nodes.extend(child for child in children if child is not None)
+        found.sort()
+        return found
+
+    def active_at(self, time: float) -> list[Interval]:
+        return self._query(time, nextafter(time, inf))
+
+    def overlapping(self, start: float, end: float) -> list[Interval]:
+        return self._query(start, end)
+
+    def collisions(self) -> list[Collision]:
+        return [
+            collision
+            for effect_type, table in self.tables.items()
+            for collision in find_collisions(effect_type, table)
+        ]
+
+
+def get_interval(effect_type: EffectType, table: EventTable, row: int) -> Interval:
+    return Interval(table.start[row], table.end[row], effect_type, row,
+                    table.effect_index[row], table.note[row], table.channel[row])
+
+
+def _sort_rows_by_note(table: EventTable) -> tuple[list[int], list[int]]:
+    notes = [note << 4 | channel for note, channel in zip(table.note, table.channel)]
+    rows = sorted(range(len(notes)), key=table.start.__getitem__)
+    rows.sort(key=notes.__getitem__)
+    return rows, notes
+
+
+def find_collisions(effect_type: EffectType, table: EventTable) -> list[Collision]:
+    collisions = []
+    starts, ends = table.start, table.end
+    rows, notes = _sort_rows_by_note(table)
+    holder = None
+    holder_end = 0.0
+    for row in rows:
+        if holder is not None and notes[holder] == notes[row] and starts[row] < holder_end:
+            collisions.append(Collision(
+                get_interval(effect_type, table, holder), get_interval(effect_type, table, row)
+            ))
+            if ends[row] <= holder_end:
+                continue
+        holder = row
+        holder_end = ends[row]
+    return collisions
+
+
+def merge_collisions(table: EventTable) -> EventTable:
+    spans = []
+    starts, ends = table.start, table.end
+    rows, notes = _sort_rows_by_note(table)
+    first = None
+    end = 0.0
+    for row in rows:
+        if first is not None and notes[first] == notes[row] and starts[row] < end:
+            end = max(end, ends[row])
+            continue
+        if first is not None:
+            spans.append((first, end))
+        first = row
+        end = ends[row]
+    if first is not None:
+        spans.append((first, end))
+    merged = EventTable()
+    for first, end in sorted(spans):
+        merged.append(starts[first], end, table.effect_index[first], table.note[first], table.channel[first])
+    return merged
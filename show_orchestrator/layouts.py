@@ -0,0 +1,16 @@
+from enum import StrEnum
+
+
+COMBINED_MIDI_KEY = "midi"
+
+
+class MidiLayout(StrEnum):
+    PER_TRACK = "per-track"
+    PER_EFFECT = "per-effect"
+    PER_SONG = "per-song"
+
+
+class CollisionPolicy(StrEnum):
+    IGNORE = "ignore"
+    FLAG = "flag"
+    MERGE = "merge"
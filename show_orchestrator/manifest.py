@@ -0,0 +1,67 @@
+import hashlib
+import json
+from pathlib import Path
+
+from show_orchestrator.compiler import EventTable
+
+
+MANIFEST_FILE_NAME = ".show_manifest.json"
+MANIFEST_VERSION = 2
+
+
+def new_digest() -> "hashlib._Hash":
+    return hashlib.blake2b(digest_size=16)
+
+
+def hash_event_table(table: EventTable, **settings) -> str:
+    digest = new_digest()
+    digest.update(json.dumps(settings, sort_keys=True).encode())
+    for column in (table.start, table.end, table.note, table.channel):
+        digest.update(column.tobytes())
+    return digest.hexdigest()
+
+
+def hash_file_stat(file_path: Path) -> str:
+    stat = file_path.stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class BuildManifest:
+
+    def __init__(self, output_dir: Path, load: bool = True) -> None:
+        self.file_path = output_dir / MANIFEST_FILE_NAME
+        self.previous = {}
+        self.current = {}
+        self.skipped = 0
+        if load and self.file_path.exists():
+            with open(self.file_path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+            if data.get("version") == MANIFEST_VERSION:
+                self.previous = data.get("entries", {})
+
+    def get(self, section: str, key: str) -> dict | None:
+        return self.previous.get(section, {}).get(key)
+
+    def is_fresh(self, section: str, key: str, digest: str, output_path: Path) -> bool:
+        entry = self.get(section, key)
+        fresh = entry is not None and entry["hash"] == digest and output_path.exists()
+        if fresh:
+            self.skipped += 1
+        return fresh
+
+    def record(self, section: str, key: str, digest: str, **data) -> None:
+        self.current.setdefault(section, {})[key] = {"hash": digest, **data}
+
+    def advance(self) -> None:
+        self.previous = self.current
+        self.current = {}
+        self.skipped = 0
+
+    def clear(self) -> None:
+        self.previous = {}
+        self.current = {}
+        self.skipped = 0
+
+    def save(self) -> None:
+        with open(self.file_path, 'w', encoding='utf-8') as file:
+            json.dump({"version": MANIFEST_VERSION, "entries": self.current}, file, indent=2)
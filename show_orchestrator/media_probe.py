@@ -0,0 +1,276 @@
+import json
+import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from show_orchestrator.models import Show, to_seconds
+
+
+PROBE_CACHE_FILE_NAME = ".media_probe.json"
+PROBE_CACHE_VERSION = 1
+MP3_SCAN_SIZE = 1 << 16
+
+MPEG_BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+MPEG_SAMPLE_RATES = {1: (44100, 48000, 32000), 2: (22050, 24000, 16000), 2.5: (11025, 12000, 8000)}
+
+
+class MediaInfo(BaseModel):
+    format: str
+    duration: float
+    sample_rate: int
+    channels: int
+
+
+class DurationMismatch(BaseModel):
+    track: str
+    file_path: str
+    declared: float
+    probed: float
+
+
+def _read_chunks(file, end: int):
+    while file.tell() + 8 <= end:
+        header = file.read(8)
+        chunk_id, size = header[:4], header[4:]
+        yield chunk_id, size, file.tell()
+
+
+def probe_wav(file) -> MediaInfo:
+    riff, _, wave = struct.unpack("<4sI4s", file.read(12))
+    if riff != b"RIFF" or wave != b"WAVE":
+        raise ValueError("not a RIFF/WAVE file")
+    end = os.fstat(file.fileno()).st_size
+    sample_rate = channels = block_align = data_size = None
+    for chunk_id, size, offset in _read_chunks(file, end):
+        size = struct.unpack("<I", size)[0]
+        if chunk_id == b"fmt ":
+            _, channels, sample_rate, _, block_align = struct.unpack("<HHIIH", file.read(14))
+        elif chunk_id == b"data":
+            data_size = min(size, end - offset)
+        if sample_rate is not None and data_size is not None:
+            break
+        file.seek(offset + size + (size & 1))
+    if sample_rate is None or data_size is None or not block_align:
+        raise ValueError("missing fmt or data chunk")
+    return MediaInfo(format="wav", duration=data_size // block_align / sample_rate,
+                     sample_rate=sample_rate, channels=channels)
+
+
+def _extended_to_float(data: bytes) -> float:
+    exponent, mantissa = struct.unpack(">HQ", data)
+    sign = -1 if exponent & 0x8000 else 1
+    exponent &= 0x7FFF
+    if exponent == 0 and mantissa == 0:
+        return 0.0
+    return sign * mantissa * 2.0 ** (exponent - 16383 - 63)
+
+
+def probe_aiff(file) -> MediaInfo:
+    form, _, kind = struct.unpack(">4sI4s", file.read(12))
+    if form != b"FORM" or kind not in (b"AIFF", b"AIFC"):
+        raise ValueError("not an AIFF/AIFC file")
+    end = os.fstat(file.fileno()).st_size
+    for chunk_id, size, offset in _read_chunks(file, end):
+        size = struct.unpack(">I", size)[0]
+        if chunk_id == b"COMM":
+            channels, frames, _ = struct.unpack(">hIh", file.read(8))
+            sample_rate = _extended_to_float(file.read(10))
+            if not sample_rate:
+                raise ValueError("invalid sample rate")
+            return MediaInfo(format="aiff", duration=frames / sample_rate,
+                             sample_rate=round(sample_rate), channels=channels)
+        file.seek(offset + size + (size & 1))
+    raise ValueError("missing COMM chunk")
+
+
+def _parse_mpeg_header(header: int) -> tuple[float, int, int, int, int] | None:
+    if header >> 21 != 0x7FF:
+        return None
+    version = {0: 2.5, 2: 2, 3: 1}.get(header >> 19 & 3)
+    layer = {1: 3, 2: 2, 3: 1}.get(header >> 17 & 3)
+    bitrate_index = header >> 12 & 15
+    rate_index = header >> 10 & 3
+    if version is None or layer is None or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    bitrate = MPEG_BITRATES[(1 if version == 1 else 2, layer)][bitrate_index] * 1000
+    sample_rate = MPEG_SAMPLE_RATES[version][rate_index]
+    if layer == 1:
+        samples = 384
+    elif layer == 3 and version != 1:
+        samples = 576
+    else:
+        samples = 1152
+    channels = 1 if header >> 6 & 3 == 3 else 2
+    return version, bitrate, sample_rate, samples, channels
+
+
+def probe_mp3(file) -> MediaInfo:
+    size = os.fstat(file.fileno()).st_size
+    data = file.read(MP3_SCAN_SIZE)
+    start = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        tag_size = 10 + (data[6] << 21 | data[7] << 14 | data[8] << 7 | data[9])
+        start = tag_size
+        file.seek(start)
+        data = file.read(MP3_SCAN_SIZE)
+    audio_end = size
+    if size >= 128:
+        file.seek(size - 128)
+        if file.read(3) == b"TAG":
+            audio_end -= 128
+    index = data.find(b"\xff")
+    while 0 <= index <= len(data) - 4:
+        frame = _parse_mpeg_header(int.from_bytes(data[index:index + 4], "big"))
+        if frame is not None:
+            break
+        index = data.find(b"\xff", index + 1)
+    else:
+        raise ValueError("no MPEG audio frame found")
+    version, bitrate, sample_rate, samples, channels = frame
+    if version == 1:
+        side_info = 17 if channels == 1 else 32
+    else:
+        side_info = 9 if channels == 1 else 17
+    for tag_offset in (index + 4 + side_info, index + 36):
+        tag = data[tag_offset:tag_offset + 4]
+        if tag in (b"Xing", b"Info") and int.from_bytes(data[tag_offset + 4:tag_offset + 8], "big") & 1:
+            frames = int.from_bytes(data[tag_offset + 8:tag_offset + 12], "big")
+            return MediaInfo(format="mp3", duration=frames * samples / sample_rate,
+                             sample_rate=sample_rate, channels=channels)
+        if tag == b"VBRI":
+            frames = int.from_bytes(data[tag_offset + 14:tag_offset + 18], "big")
+            return MediaInfo(format="mp3", duration=frames * samples / sample_rate,
+                             sample_rate=sample_rate, channels=channels)
+    return MediaInfo(format="mp3", duration=(audio_end - start - index) * 8 / bitrate,
+                     sample_rate=sample_rate, channels=channels)
+
+
+PROBES = {b"RIFF": probe_wav, b"FORM": probe_aiff}
+
+
+def probe_media(file_path: Path) -> MediaInfo:
+    with open(file_path, 'rb') as file:
+        magic = file.read(4)
+        file.seek(0)
+        probe = PROBES.get(magic)
+        if probe is None:
+            if file_path.suffix.lower() != ".mp3" and magic[:3] != b"ID3" and magic[:1] != b"\xff":
+                raise ValueError("unsupported media format")
+            probe = probe_mp3
+        try:
+            return probe(file)
+        except struct.error:
+            raise ValueError("truncated header")
+
+
+class MediaProbeCache:
+
+    def __init__(self, cache_dir: Path | None = None) -> None:
+        self.file_path = cache_dir / PROBE_CACHE_FILE_NAME if cache_dir is not None else None
+        self.entries: dict[str, dict] = {}
+        self.probed = 0
+        self.changed = False
+        self.lock = threading.Lock()
+        if self.file_path is not None and self.file_path.exists():
+            with open(self.file_path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+            if data.get("version") == PROBE_CACHE_VERSION:
+                self.entries = data.get("entries", {})
+
+    def probe(self, file_path: Path) -> MediaInfo:
+        key = os.path.abspath(file_path)
+        stat = os.stat(key)
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return MediaInfo(**entry["info"])
+        info = probe_media(file_path)
+        with self.lock:
+            self.entries[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "info": info.model_dump()}
+            self.probed += 1
+            self.changed = True
+        return info
+
+    def probe_all(self, file_paths: list[Path], max_workers: int = 4) -> dict[Path, MediaInfo | Exception]:
+        def probe(file_path: Path) -> MediaInfo | Exception:
+            try:
+                return self.probe(file_path)
+            except (OSError, ValueError) as error:
+                return error
+
+        unique = list(dict.fromkeys(file_paths))
+        if len(unique) <= 1:
+            return {file_path: probe(file_path) for file_path in unique}
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="media-probe") as executor:
+            return dict(zip(unique, executor.map(probe, unique)))
+
+    def save(self) -> None:
+        if self.file_path is None or not self.changed:
+            return
+        with open(self.file_path, 'w', encoding='utf-8') as file:
+            json.dump({"version": PROBE_CACHE_VERSION, "entries": self.entries}, file, indent=2)
+        self.changed = False
+
+
+def get_media_files(show: Show) -> list[Path]:
+    files = []
+    for audio_track in show.audio_tracks:
+        if audio_track.file_path:
+            files.append(Path(audio_track.file_path))
+        for extra_track in audio_track.extra_tracks or []:
+            files.append(Path(extra_track.file_path))
+    return files
+
+
+def find_duration_mismatches(show: Show, media: dict[Path, MediaInfo | Exception],
+                             tolerance: float = 0.5) -> list[DurationMismatch]:
+    mismatches = []
+    for audio_track in show.audio_tracks:
+        tracks = [(audio_track.name, audio_track.file_path, audio_track.duration)]
+        tracks.extend(
+            (extra_track.name, extra_track.file_path, extra_track.duration)
+            for extra_track in audio_track.extra_tracks or []
+        )
+        for name, file_path, duration in tracks:
+            info = media.get(Path(file_path)) if file_path else None
+            if not isinstance(info, MediaInfo):
+                continue
+            declared = to_seconds(duration)
+            if abs(declared - info.duration) > tolerance:
+                mismatches.append(DurationMismatch(
+                    track=name, file_path=file_path, declared=declared, probed=info.duration
+                ))
+    return mismatches
+
+
+def apply_probed_durations(show: Show, mismatches: list[DurationMismatch]) -> Show:
+    if not mismatches:
+        return show
+    probed = {(mismatch.track, mismatch.file_path): mismatch.probed for mismatch in mismatches}
+    audio_tracks = []
+    for audio_track in show.audio_tracks:
+        update = {}
+        duration = probed.get((audio_track.name, audio_track.file_path))
+        if duration is not None:
+            update["duration"] = duration
+        if audio_track.extra_tracks and any(
+            (extra_track.name, extra_track.file_path) in probed for extra_track in audio_track.extra_tracks
+        ):
+            update["extra_tracks"] = [
+                extra_track.model_copy(update={"duration": probed[(extra_track.name, extra_track.file_path)]})
+                if (extra_track.name, extra_track.file_path) in probed else extra_track
+                for extra_track in audio_track.extra_tracks
+            ]
+        audio_tracks.append(audio_track.model_copy(update=update) if update else audio_track)
+    return show.model_copy(update={"audio_tracks": audio_tracks})
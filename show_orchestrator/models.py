@@ -1,9 +1,37 @@
 import re
 from enum import StrEnum
+from functools import lru_cache
+from typing import TypeVar
 
 from pydantic import BaseModel, field_validator
 
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def construct_trusted(model: type[ModelT], **fields) -> ModelT:
+    instance = model.__new__(model)
+    object.__setattr__(instance, "__dict__", fields)
+    object.__setattr__(instance, "__pydantic_fields_set__", set(fields))
+    object.__setattr__(instance, "__pydantic_extra__", None)
+    object.__setattr__(instance, "__pydantic_private__", None)
+    return instance
+
+
+@lru_cache(maxsize=1 << 16)
+def _seconds_from_string(value: str) -> float:
+    minutes, seconds = map(float, value.split(':'))
+    return minutes * 60 + seconds
+
+
+def to_seconds(value: float | str | None) -> float | None:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return _seconds_from_string(value)
+    return float(value)
+
+
 class EffectType(StrEnum):
     LIGHTS = "lights"
     PROJECTION = "projection"
@@ -45,19 +73,11 @@ class Event(BaseModel):
     
     @property
     def timestamp_seconds(self) -> float:
-        if isinstance(self.timestamp, str):
-            minutes, seconds = map(float, self.timestamp.split(':'))
-            return minutes * 60 + seconds
-        return float(self.timestamp)
+        return to_seconds(self.timestamp)
     
     @property
     def duration_seconds(self) -> float | None:
-        if self.duration is None:
-            return None
-        if isinstance(self.duration, str):
-            minutes, seconds = map(float, self.duration.split(':'))
-            return minutes * 60 + seconds
-        return float(self.duration)
+        return to_seconds(self.duration)
 
 
 class ExtraAudioTrack(BaseModel):
@@ -89,17 +109,11 @@ class ExtraAudioTrack(BaseModel):
     
     @property
     def timestamp_seconds(self) -> float:
-        if isinstance(self.timestamp, str):
-            minutes, seconds = map(float, self.timestamp.split(':'))
-            return minutes * 60 + seconds
-        return float(self.timestamp)
+        return to_seconds(self.timestamp)
     
     @property
     def duration_seconds(self) -> float:
-        if isinstance(self.duration, str):
-            minutes, seconds = map(float, self.duration.split(':'))
-            return minutes * 60 + seconds
-        return float(self.duration)
+        return to_seconds(self.duration)
 
 
 class AudioTrack(BaseModel):
@@ -123,10 +137,7 @@ class AudioTrack(BaseModel):
     
     @property
     def duration_seconds(self) -> float:
-        if isinstance(self.duration, str):
-            minutes, seconds = map(float, self.duration.split(':'))
-            return minutes * 60 + seconds
-        return float(self.duration)
+        return to_seconds(self.duration)
 
 
 class Effect(BaseModel):
@@ -0,0 +1,78 @@
+from array import array
+
+from pydantic import BaseModel
+
+from show_orchestrator.compiler import EventTable
+
+
+class OptimizerStats(BaseModel):
+    zero_length: int = 0
+    overlapping: int = 0
+    retriggers: int = 0
+
+    @property
+    def removed_messages(self) -> int:
+        return 2 * (self.zero_length + self.overlapping + self.retriggers)
+
+    def add(self, other: "OptimizerStats") -> None:
+        self.zero_length += other.zero_length
+        self.overlapping += other.overlapping
+        self.retriggers += other.retriggers
+
+
+def _is_sorted(values: array) -> bool:
+    return all(previous <= current for previous, current in zip(values, values[1:]))
+
+
+def optimize_event_table(table: EventTable, min_retrigger_gap: float = 0.0,
+                         min_length: float = 0.0) -> tuple[EventTable, OptimizerStats]:
+    starts, ends = table.start, table.end
+    keys = [note << 4 | channel for note, channel in zip(table.note, table.channel)]
+    rows = range(len(table))
+    if not _is_sorted(starts):
+        rows = sorted(rows, key=starts.__getitem__)
+    spans: list[list] = []
+    open_spans: dict[int, list] = {}
+    zero_length = overlapping = retriggers = 0
+    for row in rows:
+        start = starts[row]
+        end = ends[row]
+        if end - start <= min_length:
+            zero_length += 1
+            continue
+        span = open_spans.get(keys[row])
+        if span is not None and start < span[1] + min_retrigger_gap:
+            if start < span[1]:
+                overlapping += 1
+            else:
+                retriggers += 1
+            if end > span[1]:
+                span[1] = end
+            continue
+        span = open_spans[keys[row]] = [start, end, row]
+        spans.append(span)
+    stats = OptimizerStats(zero_length=zero_length, overlapping=overlapping, retriggers=retriggers)
+    if len(spans) == len(table):
+        return table, stats
+    optimized = EventTable()
+    for start, end, row in spans:
+        optimized.append(start, end, table.effect_index[row], table.note[row], table.channel[row])
+    return optimized, stats
+
+
+def order_note_offs_first(ticks: array, statuses: array, notes: array, note_off: int) -> None:
+    index = 0
+    count = len(ticks)
+    while index < count:
+        end = index + 1
+        while end < count and ticks[end] == ticks[index]:
+            end += 1
+        if end - index > 1:
+            group = range(index, end)
+            offs = [position for position in group if statuses[position] & 0xF0 == note_off]
+            if offs and offs[-1] != index + len(offs) - 1:
+                ons = [position for position in group if statuses[position] & 0xF0 != note_off]
+                order = offs + ons
+                statuses[index:end] = array('B', [statuses[position] for position in order])
+                notes[index:end] = array('B', [notes[position] for position in order])
+        index = end
@@ -1,89 +1,181 @@
-from csv import DictReader
+import re
+from csv import reader as csv_reader
 from pathlib import Path
+from typing import Iterator
 
-import yaml
+from show_orchestrator.instrumentation import profiler
+from show_orchestrator.models import Show, AudioTrack, Effect, EffectType, Event, ExtraAudioTrack, construct_trusted
+from show_orchestrator.show_cache import ShowCache, hash_source
 
-from show_orchestrator.models import Show, AudioTrack, Effect, Event, ExtraAudioTrack
+
+CSV_FIELD_NAMES = ["name", "type", "timestamp", "duration", "note", "file"]
+CSV_ROW_TYPES = {"audio", "extra track", *EffectType}
+
+TIME_PATTERN = r"\d{1,2}:\d{2}(?:\.\d+)?"
+DURATION_PATTERN = rf"(?:{TIME_PATTERN}|\d+(?:\.\d+)?)?"
+TIME_REGEX = re.compile(TIME_PATTERN)
+TIME_COLUMN_REGEX = re.compile(rf"(?:{TIME_PATTERN}\n)*{TIME_PATTERN}")
+DURATION_COLUMN_REGEX = re.compile(rf"(?:{DURATION_PATTERN}\n)*{DURATION_PATTERN}")
+
+
+def _matches_column(regex: re.Pattern, values: list[str | None]) -> bool:
+    joined = "\n".join(value or "" for value in values)
+    return joined.count("\n") == len(values) - 1 and regex.fullmatch(joined) is not None
+
+
+def validate_timestamp_column(values: list[str | None], lines: list[int]) -> list[str]:
+    if _matches_column(TIME_COLUMN_REGEX, values):
+        return values
+    for value, line in zip(values, lines):
+        if value is None or not TIME_REGEX.fullmatch(value):
+            raise ValueError(f"Line {line}: Timestamp must be in the format 'MM:SS' or 'MM:SS.sss'")
+    return values
+
+
+def validate_duration_column(values: list[str | None], lines: list[int]) -> list[float | str | None]:
+    if _matches_column(DURATION_COLUMN_REGEX, values):
+        return [value if value is None or ":" in value else float(value) for value in values]
+    durations = []
+    for value, line in zip(values, lines):
+        if value is None or TIME_REGEX.fullmatch(value):
+            durations.append(value)
+            continue
+        try:
+            durations.append(float(value))
+        except ValueError:
+            raise ValueError(f"Line {line}: Duration must be a valid number")
+    return durations
 
 
 class Parser:
-    def __init__(self) -> None:
+    def __init__(self, cache_dir: Path | None = None, reuse_tracks: bool = False) -> None:
         self.show = None
+        self.effects = None
+        self.cache = ShowCache(cache_dir) if cache_dir is not None else None
+        self.track_cache: dict[tuple, AudioTrack] | None = {} if reuse_tracks else None
 
 
     def load_show(self, file_path: Path) -> Show:
         if file_path.suffix in [".yaml", ".yml"]:
-            return self.load_show_from_yaml(file_path)
+            load = self.load_show_from_yaml
         elif file_path.suffix == ".csv":
-            return self.load_show_from_csv(file_path)
-        raise ValueError("File type not supported")
+            load = self.load_show_from_csv
+        else:
+            raise ValueError("File type not supported")
+        with profiler.stage("parse"):
+            if self.cache is None:
+                show = load(file_path)
+            else:
+                source_hash = hash_source(file_path)
+                show = self.cache.load(file_path, source_hash)
+                if show is None:
+                    show = load(file_path)
+                    self.cache.save(file_path, source_hash, show)
+                self.show = show
+        if profiler.enabled:
+            profiler.count("parse", events=sum(
+                len(events) for audio_track in show.audio_tracks for events in audio_track.events.values()
+            ))
+        return show
 
     def load_show_from_yaml(self, file_path: Path) -> Show:
+        import yaml
+
         with open(file_path, 'r', encoding='utf-8') as file:
-            data = yaml.safe_load(file)
+            data = yaml.load(file, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
             self.show = Show(**data)
         return self.show
 
     def load_show_from_csv(self, file_path: Path) -> Show:
-        field_names = ["name", "type", "timestamp", "duration", "note", "file"]
-        self.show = Show(
-            audio_tracks = [],
-            effects = {
-                "lights": [],
-                "projection": [],
-                "homeassistant": []
-            }
-        )
-        effects_by_id = {}
-        with open(file_path, 'r', encoding='utf-8') as file:
-            reader = DictReader(file, field_names)
+        audio_tracks = list(self.iter_audio_tracks_from_csv(file_path))
+        self.show = Show.model_construct(audio_tracks=audio_tracks, effects=self.effects)
+        return self.show
+
+    def iter_audio_tracks_from_csv(self, file_path: Path) -> Iterator[AudioTrack]:
+        self.effects = {effect_type: [] for effect_type in EffectType}
+        previous_tracks = self.track_cache
+        if previous_tracks is not None:
+            self.track_cache = {}
+        effect_ids = set()
+        audio_row = None
+        rows = []
+        with open(file_path, 'r', encoding='utf-8', newline='') as file:
+            reader = csv_reader(file)
             for row in reader:
-                for key in row:
-                    if row[key] == "":
-                        row[key] = None
-                if row["type"] not in ["audio", "lights", "projection", "extra track", "homeassistant"]:
+                if len(row) < len(CSV_FIELD_NAMES):
+                    row += [""] * (len(CSV_FIELD_NAMES) - len(row))
+                name, row_type, _, _, note, _ = row[:len(CSV_FIELD_NAMES)]
+                if row_type not in CSV_ROW_TYPES:
                     continue
-                elif row["type"] == "audio":
-                    last_audio_track = AudioTrack(
-                        name = row["name"],
-                        events = {
-                            "lights": [],
-                            "projection": [],
-                            "homeassistant": []
-                        },
-                        duration = row["duration"],
-                        file_path = row["file"]
-                    )
-                    self.show.audio_tracks.append(last_audio_track)
-                elif row["type"] == "extra track":
-                    if last_audio_track is None:
-                        continue
-                    extra_track = ExtraAudioTrack(
-                        name = row["name"],
-                        duration = row["duration"],
-                        timestamp = row["timestamp"],
-                        file_path = row["file"]
-                    )
-                    if last_audio_track.extra_tracks is None:
-                        last_audio_track.extra_tracks = []
-                    last_audio_track.extra_tracks.append(extra_track)
-                else:
-                    if last_audio_track is None:
-                        continue
-
-                    if row["name"] not in effects_by_id:
-                        effect = Effect(
-                            id = row["name"],
-                            name = row["name"],
-                            note = int(row.get("note")) if row.get("note") else None,
-                        )
-                        self.show.effects[row["type"]].append(effect)
-                    
-                    last_audio_track.events[row["type"]].append(
-                        Event(
-                            timestamp = row["timestamp"],
-                            duration = row["duration"],
-                            effect_id = row["name"]
-                        )
-                    )
-        return self.show
+                if row_type == "audio":
+                    if audio_row is not None:
+                        yield self._get_audio_track(audio_row, rows, previous_tracks)
+                    audio_row = (reader.line_num, row)
+                    rows = []
+                    continue
+                if audio_row is None:
+                    continue
+                if row_type != "extra track" and name not in effect_ids:
+                    effect_ids.add(name)
+                    self.effects[EffectType(row_type)].append(construct_trusted(
+                        Effect,
+                        id = name,
+                        name = name,
+                        note = int(note) if note else None,
+                        channel = None,
+                    ))
+                rows.append((reader.line_num, row))
+        if audio_row is not None:
+            yield self._get_audio_track(audio_row, rows, previous_tracks)
+
+    def _get_audio_track(self, audio_row: tuple[int, list[str]], rows: list[tuple[int, list[str]]],
+                         previous_tracks: dict[tuple, AudioTrack] | None) -> AudioTrack:
+        if previous_tracks is None:
+            return self._build_audio_track(audio_row, rows)
+        key = (tuple(audio_row[1]), *(tuple(row) for _, row in rows))
+        audio_track = previous_tracks.get(key)
+        if audio_track is None:
+            audio_track = self._build_audio_track(audio_row, rows)
+        self.track_cache[key] = audio_track
+        return audio_track
+
+    def _build_audio_track(self, audio_row: tuple[int, list[str]], rows: list[tuple[int, list[str]]]) -> AudioTrack:
+        line, row = audio_row
+        name, _, _, duration, _, file = row[:len(CSV_FIELD_NAMES)]
+        if not duration:
+            raise ValueError(f"Line {line}: Audio track '{name}' must have a duration")
+        lines = [line for line, _ in rows]
+        timestamps = validate_timestamp_column([row[2] or None for _, row in rows], lines)
+        durations = validate_duration_column(
+            [duration, *(row[3] or None for _, row in rows)], [line, *lines]
+        )
+        audio_track = construct_trusted(
+            AudioTrack,
+            name = name,
+            events = {effect_type: [] for effect_type in EffectType},
+            extra_tracks = None,
+            duration = durations[0],
+            file_path = file or None,
+        )
+        for (line, row), timestamp, event_duration in zip(rows, timestamps, durations[1:]):
+            row_name, row_type = row[0], row[1]
+            if row_type == "extra track":
+                if event_duration is None or not row[5]:
+                    raise ValueError(f"Line {line}: Extra track '{row_name}' must have a duration and a file")
+                if audio_track.extra_tracks is None:
+                    audio_track.extra_tracks = []
+                audio_track.extra_tracks.append(construct_trusted(
+                    ExtraAudioTrack,
+                    name = row_name,
+                    duration = event_duration,
+                    timestamp = timestamp,
+                    file_path = row[5],
+                ))
+                continue
+            audio_track.events[row_type].append(construct_trusted(
+                Event,
+                timestamp = timestamp,
+                duration = event_duration,
+                effect_id = row_name,
+            ))
+        return audio_track
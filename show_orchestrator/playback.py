@@ -0,0 +1,194 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Protocol
+
+import mido
+from pydantic import BaseModel
+
+from show_orchestrator.compiler import CompiledShow
+from show_orchestrator.generator import get_sorted_midi_events
+from show_orchestrator.models import MidiEvent
+from show_orchestrator.smf import DEFAULT_VELOCITY
+
+
+SPIN_THRESHOLD = 0.002
+OVERSHOOT_SMOOTHING = 0.1
+
+
+class OutputPort(Protocol):
+    def send(self, message: mido.Message) -> None: ...
+
+
+class RecordingPort:
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        self.messages: list[tuple[float, mido.Message]] = []
+
+    def send(self, message: mido.Message) -> None:
+        self.messages.append((self.clock(), message))
+
+
+class PlaybackStats(BaseModel):
+    sent: int = 0
+    mean_latency: float = 0.0
+    max_latency: float = 0.0
+    mean_lateness: float = 0.0
+    max_lateness: float = 0.0
+    jitter: float = 0.0
+
+
+class StatsRecorder:
+
+    def __init__(self) -> None:
+        self.sent = 0
+        self.latency_total = 0.0
+        self.max_latency = 0.0
+        self.lateness_mean = 0.0
+        self.lateness_m2 = 0.0
+        self.max_lateness = 0.0
+
+    def record(self, latency: float, lateness: float) -> None:
+        self.sent += 1
+        self.latency_total += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.max_lateness = max(self.max_lateness, lateness)
+        delta = lateness - self.lateness_mean
+        self.lateness_mean += delta / self.sent
+        self.lateness_m2 += delta * (lateness - self.lateness_mean)
+
+    def summary(self) -> PlaybackStats:
+        if not self.sent:
+            return PlaybackStats()
+        return PlaybackStats(
+            sent=self.sent,
+            mean_latency=self.latency_total / self.sent,
+            max_latency=self.max_latency,
+            mean_lateness=self.lateness_mean,
+            max_lateness=self.max_lateness,
+            jitter=(self.lateness_m2 / self.sent) ** 0.5
+        )
+
+
+def get_show_midi_events(compiled_show: CompiledShow) -> tuple[list[MidiEvent], list[float]]:
+    song_positions = []
+    streams = []
+    current_position = 0
+    for audio_track in compiled_show.audio_tracks:
+        song_positions.append(current_position)
+        for table in audio_track.events.values():
+            order, times = get_sorted_midi_events(table)
+            streams.append([
+                MidiEvent(
+                    timestamp=current_position + times[index],
+                    message="note_off" if index & 1 else "note_on",
+                    channel=table.channel[index >> 1],
+                    note=table.note[index >> 1]
+                )
+                for index in order
+            ])
+        current_position += audio_track.duration
+    return list(heapq.merge(*streams, key=lambda event: event.timestamp)), song_positions
+
+
+class ShowPlayer:
+
+    def __init__(self, compiled_show: CompiledShow, port: OutputPort,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep) -> None:
+        self.port = port
+        self.clock = clock
+        self.sleep = sleep
+        self.song_names = [audio_track.name for audio_track in compiled_show.audio_tracks]
+        self.events, self.song_positions = get_show_midi_events(compiled_show)
+        self.timestamps = [event.timestamp for event in self.events]
+        self.messages = [
+            mido.Message(event.message, note=event.note, channel=event.channel, velocity=DEFAULT_VELOCITY)
+            for event in self.events
+        ]
+        self.position = 0.0
+        self.stats = StatsRecorder()
+        self.active_notes: set[tuple[int, int]] = set()
+        self.stop_event = threading.Event()
+        self.seek_target: float | None = None
+        self.overshoot = 0.0
+
+    def _get_song_index(self, song: int | str) -> int:
+        if isinstance(song, str):
+            if song not in self.song_names:
+                raise ValueError(f"Unknown song '{song}' (available: {', '.join(self.song_names)})")
+            return self.song_names.index(song)
+        if not 0 <= song < len(self.song_positions):
+            raise ValueError(f"Song index {song} is out of range (0-{len(self.song_positions) - 1})")
+        return song
+
+    def seek(self, song: int | str) -> float:
+        self.position = self.song_positions[self._get_song_index(song)]
+        self.seek_target = self.position
+        return self.position
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+    def play(self, end_song: int | str | None = None) -> PlaybackStats:
+        self.stop_event.clear()
+        self.seek_target = None
+        self.stats = StatsRecorder()
+        index = bisect_left(self.timestamps, self.position)
+        end = len(self.events)
+        if end_song is not None:
+            end_index = self._get_song_index(end_song)
+            if end_index + 1 < len(self.song_positions):
+                end = bisect_left(self.timestamps, self.song_positions[end_index + 1])
+        start_time = self.clock() - self.position
+        try:
+            while index < end and not self.stop_event.is_set():
+                if self.seek_target is not None:
+                    self._release_active_notes()
+                    index = bisect_left(self.timestamps, self.seek_target)
+                    start_time = self.clock() - self.seek_target
+                    self.seek_target = None
+                    continue
+                target = start_time + self.timestamps[index]
+                self._wait_until(target)
+                if self.stop_event.is_set() or self.seek_target is not None:
+                    continue
+                self._send(index, target)
+                index += 1
+        finally:
+            self.position = self.clock() - start_time
+            self._release_active_notes()
+        return self.stats.summary()
+
+    def _wait_until(self, target: float) -> None:
+        while self.seek_target is None:
+            remaining = target - self.clock()
+            if remaining <= 0:
+                return
+            if remaining > SPIN_THRESHOLD + self.overshoot:
+                requested = min(remaining - SPIN_THRESHOLD - self.overshoot, 0.1)
+                before = self.clock()
+                self.sleep(requested)
+                overshoot = self.clock() - before - requested
+                self.overshoot += OVERSHOOT_SMOOTHING * (max(overshoot, 0.0) - self.overshoot)
+                if self.stop_event.is_set():
+                    return
+            else:
+                self.sleep(0)
+
+    def _send(self, index: int, target: float) -> None:
+        message = self.messages[index]
+        before = self.clock()
+        self.port.send(message)
+        after = self.clock()
+        self.stats.record(after - before, before - target)
+        if message.type == "note_on":
+            self.active_notes.add((message.channel, message.note))
+        else:
+            self.active_notes.discard((message.channel, message.note))
+
+    def _release_active_notes(self) -> None:
+        for channel, note in sorted(self.active_notes):
+            self.port.send(mido.Message("note_off", note=note, channel=channel, velocity=DEFAULT_VELOCITY))
+        self.active_notes.clear()
@@ -0,0 +1,97 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+import mido
+
+from show_orchestrator.playback import OutputPort
+
+
+def get_output_names() -> list[str]:
+    try:
+        return mido.get_output_names()
+    except (ImportError, OSError):
+        return []
+
+
+class PortManager:
+
+    def __init__(self, opener: Callable[[str], OutputPort] = mido.open_output, note_duration: float = 0.1,
+                 clock: Callable[[], float] = time.monotonic, history: int = 100) -> None:
+        self.opener = opener
+        self.note_duration = note_duration
+        self.clock = clock
+        self.ports: dict[str, OutputPort] = {}
+        self.send_times: deque[tuple[str, mido.Message, float]] = deque(maxlen=history)
+        self.errors: deque[tuple[str, Exception]] = deque(maxlen=history)
+        self.scheduled: list[tuple[float, int, str, mido.Message | None]] = []
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.closed = False
+        self.worker = threading.Thread(target=self._run, name="midi-port-manager", daemon=True)
+        self.worker.start()
+
+    def prepare(self, port_name: str) -> None:
+        self._schedule(self.clock(), port_name, None)
+
+    def send(self, port_name: str, message: mido.Message, delay: float = 0.0) -> None:
+        self._schedule(self.clock() + delay, port_name, message)
+
+    def play_note(self, port_name: str, note: int, channel: int, velocity: int = 127,
+                  duration: float | None = None) -> None:
+        duration = self.note_duration if duration is None else duration
+        self.send(port_name, mido.Message("note_on", note=note, velocity=velocity, channel=channel))
+        self.send(port_name, mido.Message("note_off", note=note, velocity=velocity, channel=channel), duration)
+
+    def close(self) -> None:
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.worker.join()
+        for _, _, port_name, message in sorted(self.scheduled):
+            if message is not None and message.type == "note_off" and port_name in self.ports:
+                self.ports[port_name].send(message)
+        self.scheduled.clear()
+        for port in self.ports.values():
+            port.close()
+        self.ports.clear()
+
+    def _schedule(self, due: float, port_name: str, message: mido.Message | None) -> None:
+        with self.condition:
+            heapq.heappush(self.scheduled, (due, next(self.sequence), port_name, message))
+            self.condition.notify()
+
+    def _next_due(self) -> tuple[str, mido.Message | None] | None:
+        with self.condition:
+            while not self.closed:
+                if not self.scheduled:
+                    self.condition.wait()
+                    continue
+                remaining = self.scheduled[0][0] - self.clock()
+                if remaining <= 0:
+                    _, _, port_name, message = heapq.heappop(self.scheduled)
+                    return port_name, message
+                self.condition.wait(remaining)
+            return None
+
+    def _get_port(self, port_name: str) -> OutputPort:
+        port = self.ports.get(port_name)
+        if port is None:
+            port = self.ports[port_name] = self.opener(port_name)
+        return port
+
+    def _run(self) -> None:
+        while (scheduled := self._next_due()) is not None:
+            port_name, message = scheduled
+            try:
+                port = self._get_port(port_name)
+                if message is None:
+                    continue
+                start = time.perf_counter()
+                port.send(message)
+                self.send_times.append((port_name, message, time.perf_counter() - start))
+            except Exception as error:
+                self.errors.append((port_name, error))
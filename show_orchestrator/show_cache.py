@@ -0,0 +1,131 @@
+import marshal
+import mmap
+import os
+import struct
+from pathlib import Path
+
+from show_orchestrator.manifest import new_digest
+from show_orchestrator.models import AudioTrack, Effect, EffectType, Event, ExtraAudioTrack, Show, construct_trusted
+
+
+CACHE_MAGIC = b"SHOWC"
+CACHE_VERSION = 1
+CACHE_SUFFIX = ".showcache"
+HEADER = struct.Struct("<5sHH16s")
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def hash_source(file_path: Path) -> bytes:
+    digest = new_digest()
+    with open(file_path, 'rb') as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def encode_show(show: Show) -> tuple:
+    effects = tuple(
+        (str(effect_type), tuple((effect.id, effect.name, effect.note, effect.channel) for effect in effect_list))
+        for effect_type, effect_list in show.effects.items()
+    )
+    audio_tracks = tuple(
+        (
+            audio_track.name,
+            audio_track.duration,
+            audio_track.file_path,
+            None if audio_track.extra_tracks is None else tuple(
+                (extra_track.name, extra_track.file_path, extra_track.duration, extra_track.timestamp)
+                for extra_track in audio_track.extra_tracks
+            ),
+            tuple(
+                (
+                    str(effect_type),
+                    tuple(event.timestamp for event in events),
+                    tuple(event.effect_id for event in events),
+                    tuple(event.duration for event in events),
+                )
+                for effect_type, events in audio_track.events.items()
+            ),
+        )
+        for audio_track in show.audio_tracks
+    )
+    return effects, audio_tracks
+
+
+def decode_show(payload: tuple) -> Show:
+    effects, audio_tracks = payload
+    return construct_trusted(
+        Show,
+        audio_tracks = [
+            construct_trusted(
+                AudioTrack,
+                name = name,
+                events = {
+                    EffectType(effect_type): [
+                        construct_trusted(Event, timestamp=timestamp, effect_id=effect_id, duration=duration)
+                        for timestamp, effect_id, duration in zip(timestamps, effect_ids, durations)
+                    ]
+                    for effect_type, timestamps, effect_ids, durations in events
+                },
+                extra_tracks = None if extra_tracks is None else [
+                    construct_trusted(
+                        ExtraAudioTrack,
+                        name = extra_name,
+                        file_path = extra_file_path,
+                        duration = extra_duration,
+                        timestamp = extra_timestamp,
+                    )
+                    for extra_name, extra_file_path, extra_duration, extra_timestamp in extra_tracks
+                ],
+                duration = duration,
+                file_path = file_path,
+            )
+            for name, duration, file_path, extra_tracks, events in audio_tracks
+        ],
+        effects = {
+            EffectType(effect_type): [
+                construct_trusted(Effect, id=effect_id, name=effect_name, note=note, channel=channel)
+                for effect_id, effect_name, note, channel in effect_list
+            ]
+            for effect_type, effect_list in effects
+        },
+    )
+
+
+class ShowCache:
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+
+    def get_path(self, source_path: Path) -> Path:
+        return self.cache_dir / f".{source_path.name}{CACHE_SUFFIX}"
+
+    def load(self, source_path: Path, source_hash: bytes) -> Show | None:
+        cache_path = self.get_path(source_path)
+        try:
+            with open(cache_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                magic, version, marshal_version, cached_hash = HEADER.unpack_from(mapped)
+                if (magic, version, marshal_version, cached_hash) != (
+                    CACHE_MAGIC, CACHE_VERSION, marshal.version, source_hash
+                ):
+                    self.misses += 1
+                    return None
+                with memoryview(mapped) as view, view[HEADER.size:] as payload_view:
+                    payload = marshal.loads(payload_view)
+            show = decode_show(payload)
+        except (OSError, ValueError, EOFError, TypeError, struct.error):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return show
+
+    def save(self, source_path: Path, source_hash: bytes, show: Show) -> None:
+        cache_path = self.get_path(source_path)
+        temporary_path = cache_path.with_name(f"{cache_path.name}.tmp")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(temporary_path, 'wb') as file:
+            file.write(HEADER.pack(CACHE_MAGIC, CACHE_VERSION, marshal.version, source_hash))
+            file.write(marshal.dumps(encode_show(show)))
+        os.replace(temporary_path, cache_path)
@@ -0,0 +1,66 @@
+import struct
+from array import array
+from itertools import chain
+from pathlib import Path
+
+
+NOTE_OFF = 0x80
+NOTE_ON = 0x90
+DEFAULT_VELOCITY = 64
+DEFAULT_TICKS_PER_BEAT = 480
+END_OF_TRACK = b"\x00\xff\x2f\x00"
+
+
+def bpm_to_tempo(bpm: float) -> int:
+    return int(round(60 * 1e6 / bpm))
+
+
+def seconds_to_ticks(seconds: array, ticks_per_beat: int, tempo: int) -> array:
+    scale = tempo * 1e-6 / ticks_per_beat
+    return array('q', [round(second / scale) for second in seconds])
+
+
+def encode_variable_int(value: int) -> bytes:
+    encoded = [value & 0x7f]
+    value >>= 7
+    while value:
+        encoded.append((value & 0x7f) | 0x80)
+        value >>= 7
+    return bytes(reversed(encoded))
+
+
+def encode_track(ticks: array, statuses: array, notes: array, velocity: int = DEFAULT_VELOCITY) -> bytearray:
+    data = bytearray()
+    running_status = None
+    deltas = [current - previous for previous, current in zip(chain((0,), ticks), ticks)]
+    for delta, status, note in zip(deltas, statuses, notes):
+        if delta < 0x80:
+            data.append(delta)
+        else:
+            data += encode_variable_int(delta)
+        if status != running_status:
+            data.append(status)
+            running_status = status
+        data.append(note)
+        data.append(velocity)
+    data += END_OF_TRACK
+    return data
+
+
+def encode_midi_file(tracks: list[bytearray], ticks_per_beat: int = DEFAULT_TICKS_PER_BEAT,
+                     midi_type: int = 0) -> bytearray:
+    data = bytearray(b"MThd")
+    data += struct.pack(">Lhhh", 6, midi_type, len(tracks), ticks_per_beat)
+    for track in tracks:
+        data += b"MTrk"
+        data += struct.pack(">L", len(track))
+        data += track
+    return data
+
+
+def write_midi_file(file_path: Path, tracks: list[bytearray], ticks_per_beat: int = DEFAULT_TICKS_PER_BEAT,
+                    midi_type: int = 0) -> int:
+    data = encode_midi_file(tracks, ticks_per_beat, midi_type)
+    with open(file_path, 'wb') as file:
+        file.write(data)
+    return len(data)
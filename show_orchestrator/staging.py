@@ -0,0 +1,151 @@
+import hashlib
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from show_orchestrator.manifest import BuildManifest, hash_file_stat
+
+
+HASH_CHUNK_SIZE = 1 << 20
+
+_file_hashes: dict[tuple[int, int, int, int], str] = {}
+_file_hashes_lock = threading.Lock()
+
+
+class StagedMedia(BaseModel):
+    source: Path
+    destination: Path
+    method: str
+    size: int
+    seconds: float
+
+
+def hash_file(file_path: Path) -> str:
+    stat = file_path.stat()
+    key = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    with _file_hashes_lock:
+        cached = _file_hashes.get(key)
+    if cached is not None:
+        return cached
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    digest = digest.hexdigest()
+    with _file_hashes_lock:
+        _file_hashes[key] = digest
+    return digest
+
+
+def _copy_file_range(src_fd: int, dst_fd: int, size: int) -> None:
+    offset = 0
+    while offset < size:
+        copied = os.copy_file_range(src_fd, dst_fd, size - offset)
+        if not copied:
+            break
+        offset += copied
+
+
+def _sendfile(src_fd: int, dst_fd: int, size: int) -> None:
+    offset = 0
+    while offset < size:
+        copied = os.sendfile(dst_fd, src_fd, offset, size - offset)
+        if not copied:
+            break
+        offset += copied
+
+
+ZERO_COPY_METHODS = [
+    (name, function) for name, function, available in (
+        ("copy_file_range", _copy_file_range, hasattr(os, "copy_file_range")),
+        ("sendfile", _sendfile, hasattr(os, "sendfile")),
+    ) if available
+]
+
+
+def copy_file(source: Path, destination: Path) -> str:
+    with open(source, 'rb') as src_file, open(destination, 'wb') as dst_file:
+        size = os.fstat(src_file.fileno()).st_size
+        for method, copy_range in ZERO_COPY_METHODS:
+            try:
+                copy_range(src_file.fileno(), dst_file.fileno(), size)
+                return method
+            except OSError:
+                src_file.seek(0)
+                dst_file.seek(0)
+                dst_file.truncate()
+        shutil.copyfileobj(src_file, dst_file, HASH_CHUNK_SIZE)
+        return "copy"
+
+
+class MediaStager:
+
+    def __init__(self, output_dir: Path, max_workers: int = 4, link: bool = True,
+                 manifest: BuildManifest | None = None) -> None:
+        self.output_dir = output_dir
+        self.link = link
+        self.manifest = manifest
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="media-stager")
+        self.pending: dict[Path, Future] = {}
+        self.lock = threading.Lock()
+
+    def stage(self, file_path: Path) -> Path:
+        destination = self.output_dir / file_path.name
+        if destination not in self.pending:
+            self.pending[destination] = self.executor.submit(self._stage, file_path, destination)
+        return destination
+
+    def wait(self) -> list[StagedMedia]:
+        staged = [future.result() for future in self.pending.values()]
+        self.executor.shutdown()
+        return staged
+
+    def _is_current(self, source: Path, destination: Path) -> bool:
+        if not destination.exists():
+            return False
+        src_stat = source.stat()
+        dst_stat = destination.stat()
+        if (src_stat.st_dev, src_stat.st_ino) == (dst_stat.st_dev, dst_stat.st_ino):
+            return True
+        if src_stat.st_size != dst_stat.st_size or src_stat.st_mtime_ns != dst_stat.st_mtime_ns:
+            return False
+        if self.manifest is not None:
+            with self.lock:
+                entry = self.manifest.get("media", destination.name)
+            if entry is not None and entry["hash"] == hash_file_stat(source):
+                return True
+        return hash_file(source) == hash_file(destination)
+
+    def _stage(self, source: Path, destination: Path) -> StagedMedia:
+        start = time.perf_counter()
+        if self._is_current(source, destination):
+            method = "skipped"
+        else:
+            temporary = destination.with_name(f".{destination.name}.staging")
+            temporary.unlink(missing_ok=True)
+            method = None
+            if self.link:
+                try:
+                    os.link(source, temporary)
+                    method = "hardlink"
+                except OSError:
+                    pass
+            if method is None:
+                method = copy_file(source, temporary)
+                shutil.copystat(source, temporary)
+            os.replace(temporary, destination)
+        if self.manifest is not None:
+            with self.lock:
+                self.manifest.record("media", destination.name, hash_file_stat(source))
+        return StagedMedia(
+            source=source,
+            destination=destination,
+            method=method,
+            size=destination.stat().st_size,
+            seconds=time.perf_counter() - start
+        )
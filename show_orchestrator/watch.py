@@ -0,0 +1,23 @@
+import time
+from pathlib import Path
+from typing import Callable, Iterator
+
+
+def get_file_signature(file_path: Path) -> tuple[int, int, int] | None:
+    try:
+        stat = file_path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def watch_file(file_path: Path, interval: float = 0.2,
+               sleep: Callable[[float], None] = time.sleep) -> Iterator[float]:
+    signature = get_file_signature(file_path)
+    while True:
+        sleep(interval)
+        current = get_file_signature(file_path)
+        if current is None or current == signature:
+            continue
+        signature = current
+        yield current[0] / 1e9
@@ -0,0 +1,55 @@
+import pytest
+
+from show_orchestrator.compiler import CompiledShow, compile_show
+from show_orchestrator.models import AudioTrack, Effect, EffectType, Event, Show
+
+
+class FakeClock:
+
+    def __init__(self, start: float = 100.0, spin: float = 0.0005) -> None:
+        self.now = start
+        self.spin = spin
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds if seconds > 0 else self.spin
+
+
+def make_show(songs: dict[str, tuple[float, list[tuple[float, str, float | None]]]]) -> Show:
+    effects = [
+        Effect(id="wash", name="Wash", note=10, channel=0),
+        Effect(id="strobe", name="Strobe", note=11, channel=0),
+        Effect(id="spot", name="Spot", note=12, channel=1),
+    ]
+    return Show(
+        audio_tracks=[
+            AudioTrack(
+                name=name,
+                duration=duration,
+                events={EffectType.LIGHTS: [
+                    Event(timestamp=timestamp, effect_id=effect_id, duration=length)
+                    for timestamp, effect_id, length in events
+                ]}
+            )
+            for name, (duration, events) in songs.items()
+        ],
+        effects={EffectType.LIGHTS: effects}
+    )
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def compiled_show() -> CompiledShow:
+    return compile_show(make_show({
+        "Intro": (4.0, [(0.0, "wash", 1.0), (0.5, "strobe", 0.25), (2.0, "spot", 1.5)]),
+        "Finale": (3.0, [(0.0, "wash", 2.0), (1.0, "spot", 0.5)]),
+    }))
@@ -0,0 +1,120 @@
+import json
+
+import pytest
+
+from show_orchestrator.allocator import MIDI_NOTES, NoteAllocator
+from show_orchestrator.models import Effect, EffectType
+
+
+def make_effects(*effects: Effect) -> dict[EffectType, list[Effect]]:
+    return {EffectType.LIGHTS: list(effects)}
+
+
+def test_allocates_lowest_free_note():
+    allocator = NoteAllocator()
+    allocator.reserve(0, 0)
+    allocator.reserve(2, 0)
+
+    assert allocator.allocate(0) == (1, 0)
+    assert allocator.allocate(0) == (3, 0)
+    assert allocator.allocate(5) == (0, 5)
+    assert not allocator.is_free(3, 0)
+    assert allocator.is_free(4, 0)
+
+
+def test_spills_over_to_next_channel():
+    allocator = NoteAllocator()
+    for note in range(MIDI_NOTES):
+        allocator.reserve(note, 15)
+
+    assert allocator.next_free(15) is None
+    assert allocator.allocate(15) == (0, 0)
+
+
+def test_raises_when_every_note_is_taken():
+    allocator = NoteAllocator()
+    for channel in range(16):
+        for note in range(MIDI_NOTES):
+            allocator.reserve(note, channel)
+
+    with pytest.raises(ValueError, match="No free MIDI notes"):
+        allocator.allocate(0)
+
+
+@pytest.mark.parametrize("effect,message", [
+    (Effect(id="a", name="a", note=128, channel=0), "Note 128"),
+    (Effect(id="a", name="a", note=-1, channel=0), "Note -1"),
+    (Effect(id="a", name="a", note=1, channel=16), "Channel 16"),
+    (Effect(id="a", name="a", channel=20), "Channel 20"),
+    (Effect(id="a", name="a", channel=-1), "Channel -1"),
+])
+def test_out_of_range_effects(effect, message):
+    with pytest.raises(ValueError, match=message):
+        NoteAllocator().assign_effects(make_effects(effect))
+
+
+def test_assign_effects_keeps_explicit_notes():
+    wash = Effect(id="wash", name="Wash", note=0)
+    spot = Effect(id="spot", name="Spot")
+    beam = Effect(id="beam", name="Beam", channel=3)
+
+    mapping = NoteAllocator().assign_effects(make_effects(spot, wash, beam))
+
+    assert [(effect.note, effect.channel) for effect in (wash, spot, beam)] == [(0, None), (1, None), (0, 3)]
+    assert set(mapping) == {"wash", "spot", "beam"}
+
+
+def test_note_map_round_trip(tmp_path):
+    note_map = tmp_path / "notes.json"
+    allocator = NoteAllocator()
+    allocator.assign_effects(make_effects(
+        Effect(id="wash", name="Wash"), Effect(id="spot", name="Spot"), Effect(id="beam", name="Beam", channel=2)
+    ))
+    allocator.save(note_map)
+
+    restored = NoteAllocator()
+    restored.load(note_map)
+    spot = Effect(id="spot", name="Spot")
+    beam = Effect(id="beam", name="Beam", channel=2)
+    restored.assign_effects(make_effects(spot, beam))
+
+    assert json.loads(note_map.read_text())["notes"] == {
+        "wash": {"note": 0, "channel": 0},
+        "spot": {"note": 1, "channel": 0},
+        "beam": {"note": 0, "channel": 2},
+    }
+    assert (spot.note, beam.note, beam.channel) == (1, 0, 2)
+    restored.save(note_map)
+    assert json.loads(note_map.read_text())["notes"]["wash"] == {"note": 0, "channel": 0}
+
+
+def test_load_ignores_missing_file_and_other_versions(tmp_path):
+    allocator = NoteAllocator()
+    allocator.load(tmp_path / "missing.json")
+    note_map = tmp_path / "notes.json"
+    note_map.write_text(json.dumps({"version": 99, "notes": {"wash": {"note": 5, "channel": 0}}}))
+    allocator.load(note_map)
+
+    assert allocator.saved_notes == {}
+
+
+@pytest.mark.parametrize("effect,saved,restored", [
+    (Effect(id="spot", name="Spot"), (7, 0), True),
+    (Effect(id="spot", name="Spot"), (7, 4), True),
+    (Effect(id="spot", name="Spot", channel=4), (7, 4), True),
+    (Effect(id="spot", name="Spot", channel=2), (7, 4), False),
+    (Effect(id="spot", name="Spot"), (10, 0), False),
+    (Effect(id="spot", name="Spot"), (200, 0), False),
+    (Effect(id="spot", name="Spot"), (7, 20), False),
+])
+def test_restore_rules(effect, saved, restored):
+    allocator = NoteAllocator()
+    allocator.saved_notes = {"spot": saved}
+
+    allocator.assign_effects(make_effects(Effect(id="wash", name="Wash", note=10), effect))
+
+    if restored:
+        assert (effect.note, effect.channel if effect.channel is not None else 0) == saved
+    else:
+        assert (effect.note, effect.channel) != saved
+    assert allocator.assigned_notes["spot"] == (effect.note, effect.channel or 0)
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+import show_orchestrator.generator as generator_module
+from show_orchestrator.generator import MidiGenerator
+from show_orchestrator.instrumentation import Profiler
+from show_orchestrator.layouts import CollisionPolicy, MidiLayout
+
+from conftest import make_show
+
+
+SONGS = {
+    "Intro": (4.0, [(0.0, "wash", 1.0), (0.5, "wash", 1.0), (2.0, "spot", 0.5), (2.55, "spot", 0.5)]),
+    "Finale": (3.0, [(0.0, "strobe", 2.0), (1.0, "strobe", 0.5)]),
+}
+
+
+@pytest.mark.parametrize("collisions,optimize", [
+    (CollisionPolicy.FLAG, True),
+    (CollisionPolicy.MERGE, False),
+    (CollisionPolicy.MERGE, True),
+])
+def test_rebuild_reuses_unmodified_tables(collisions, optimize):
+    show = make_show(SONGS)
+    generator = MidiGenerator(collisions=collisions, optimize=optimize, min_retrigger_gap=0.1)
+    first = generator.compile_show(show)
+    first_collisions = {name: len(found) for name, found in generator.collisions.items()}
+    first_stats = generator.optimizer_stats.model_copy()
+    first_lengths = [{key: len(table) for key, table in track.events.items()} for track in first.audio_tracks]
+
+    second = generator.compile_show(show)
+
+    assert second.compiled_tracks == first.compiled_tracks
+    assert first_collisions == {"Intro": 1, "Finale": 1}
+    assert {name: len(found) for name, found in generator.collisions.items()} == first_collisions
+    assert generator.optimizer_stats == first_stats
+    assert [{key: len(table) for key, table in track.events.items()} for track in second.audio_tracks] == first_lengths
+    assert [len(table) for track in second.compiled_tracks for table in track.events.values()] == [4, 2]
+    if optimize:
+        assert first_stats.overlapping == (0 if collisions == CollisionPolicy.MERGE else 2)
+        assert first_stats.retriggers == 1
+
+
+def test_midi_render_stage_excludes_consumer_time(tmp_path, monkeypatch):
+    profiler = Profiler()
+    profiler.enable()
+    monkeypatch.setattr(generator_module, "profiler", profiler)
+    generator = MidiGenerator()
+    compiled_show = generator.compile_show(make_show(SONGS))
+
+    tracks = []
+    for track_name, midi_files in generator.iter_midi_files(compiled_show, tmp_path):
+        tracks.append(track_name)
+        time.sleep(0.2)
+
+    stats = profiler.stages["midi_render"]
+    assert tracks == ["Intro", "Finale"]
+    assert stats.wall_time < 0.2
+    assert stats.calls == 3
+    assert stats.events == 6
+    assert stats.bytes_written == sum(path.stat().st_size for path in tmp_path.glob("*.mid"))
+
+
+@pytest.mark.parametrize("layout", list(MidiLayout))
+@pytest.mark.parametrize("collisions,optimize", [(CollisionPolicy.FLAG, False), (CollisionPolicy.MERGE, True)])
+def test_parallel_rendering_matches_serial(tmp_path, layout, collisions, optimize):
+    outputs = []
+    for jobs in (1, 2):
+        output_dir = tmp_path / f"jobs{jobs}"
+        output_dir.mkdir()
+        generator = MidiGenerator(jobs=jobs, layout=layout, collisions=collisions, optimize=optimize)
+        midi_files = generator.generate_midi_files(make_show(SONGS), output_dir)
+        outputs.append((
+            {
+                track_name: {key: (entry["file_path"].name, entry["duration"]) for key, entry in files.items()}
+                for track_name, files in midi_files.items()
+            },
+            {path.name: path.read_bytes() for path in sorted(output_dir.iterdir())}
+        ))
+
+    assert outputs[0][1]
+    assert outputs[0] == outputs[1]
@@ -0,0 +1,241 @@
+import argparse
+import http.server
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from main import BuildSession, add_build_arguments
+
+from show_orchestrator.compiler import compile_show
+from show_orchestrator.homeassistant import (
+    ConnectionPool, HomeAssistantClient, HomeAssistantDispatcher, ServiceCall, get_service_calls
+)
+from show_orchestrator.models import AudioTrack, Effect, EffectType, Event, Show
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, json.loads(body), self.client_address, self.headers["Authorization"]))
+        if self.path.endswith("/drop"):
+            self.close_connection = True
+            return
+        if self.path.endswith("/slow"):
+            time.sleep(0.5)
+        status = 500 if self.path.endswith("/fail") else 200
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"[]")
+        self.wfile.flush()
+        if server.close_after_response:
+            self.close_connection = True
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = []
+    server.close_after_response = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def base_url(server) -> str:
+    host, port = server.server_address
+    return f"http://{host}:{port}"
+
+
+def make_show() -> Show:
+    return Show(
+        audio_tracks=[
+            AudioTrack(name="Intro", duration=2.0, events={EffectType.HOMEASSISTANT: [
+                Event(timestamp=0.0, effect_id="light.left"),
+                Event(timestamp=0.0, effect_id="light.right"),
+                Event(timestamp=0.5, effect_id="scene_red", duration=0.5),
+                Event(timestamp=1.0, effect_id="mystery"),
+            ]}),
+            AudioTrack(name="Finale", duration=2.0, events={EffectType.HOMEASSISTANT: [
+                Event(timestamp=0.0, effect_id="light.left"),
+            ]}),
+        ],
+        effects={EffectType.HOMEASSISTANT: [
+            Effect(id="light.left", name="Left", note=1),
+            Effect(id="light.right", name="Right", note=2),
+            Effect(id="scene_red", name="Red", note=3),
+            Effect(id="mystery", name="Unknown", note=4),
+        ]}
+    )
+
+
+SERVICE_MAP = {
+    "scene_red": {
+        "start": {"service": "scene.turn_on", "data": {"entity_id": "scene.red"}},
+        "end": {"service": "light.turn_off", "data": {"entity_id": "light.left", "transition": 1}},
+    },
+}
+
+
+def test_get_service_calls_batches_calls_at_the_same_time():
+    calls, unmapped = get_service_calls(compile_show(make_show()), SERVICE_MAP)
+
+    assert unmapped == {"mystery"}
+    assert [(call.time, call.service, call.data) for call in calls] == [
+        (0.0, "homeassistant.turn_on", {"entity_id": ["light.left", "light.right"]}),
+        (0.5, "scene.turn_on", {"entity_id": "scene.red"}),
+        (1.0, "light.turn_off", {"entity_id": "light.left", "transition": 1}),
+        (2.0, "homeassistant.turn_on", {"entity_id": "light.left"}),
+    ]
+    unbatched, _ = get_service_calls(compile_show(make_show()), SERVICE_MAP, batch=False)
+    assert len(unbatched) == 5
+
+
+def test_dispatcher_sends_batches_over_pooled_connections(server, base_url, clock):
+    calls, _ = get_service_calls(compile_show(make_show()), SERVICE_MAP)
+    client = HomeAssistantClient(base_url, token="secret", pool_size=1)
+    dispatcher = HomeAssistantDispatcher(calls, client, clock=clock, sleep=clock.sleep)
+    stats = dispatcher.play()
+    client.close()
+
+    assert [(path, body) for path, body, _, _ in server.requests] == [
+        ("/api/services/homeassistant/turn_on", {"entity_id": ["light.left", "light.right"]}),
+        ("/api/services/scene/turn_on", {"entity_id": "scene.red"}),
+        ("/api/services/light/turn_off", {"entity_id": "light.left", "transition": 1}),
+        ("/api/services/homeassistant/turn_on", {"entity_id": "light.left"}),
+    ]
+    assert {authorization for _, _, _, authorization in server.requests} == {"Bearer secret"}
+    assert client.pool.opened == 1
+    assert len({address for _, _, address, _ in server.requests}) == 1
+    assert stats.sent == 4
+    assert [(result.time, result.status, result.error) for result in dispatcher.results] == [
+        (0.0, 200, None), (0.5, 200, None), (1.0, 200, None), (2.0, 200, None)
+    ]
+    assert all(result.latency >= 0 and result.lateness >= 0 for result in dispatcher.results)
+
+
+def test_dispatcher_starts_from_position(server, base_url, clock):
+    calls, _ = get_service_calls(compile_show(make_show()), SERVICE_MAP)
+    client = HomeAssistantClient(base_url)
+    dispatcher = HomeAssistantDispatcher(calls, client, clock=clock, sleep=clock.sleep)
+    dispatcher.play(position=1.0)
+    client.close()
+
+    assert [result.time for result in dispatcher.results] == [1.0, 2.0]
+
+
+def test_dispatcher_reports_errors(server, base_url, clock):
+    calls = [
+        ServiceCall(time=0.0, service="light.fail", data={"entity_id": "light.left"}),
+        ServiceCall(time=0.0, service="light.drop", data={"entity_id": "light.right"}),
+        ServiceCall(time=0.5, service="light.turn_on", data={"entity_id": "light.left"}),
+    ]
+    client = HomeAssistantClient(base_url)
+    dispatcher = HomeAssistantDispatcher(calls, client, clock=clock, sleep=clock.sleep)
+    stats = dispatcher.play()
+    client.close()
+
+    results = {result.service: result for result in dispatcher.results}
+    assert (results["light.fail"].status, results["light.fail"].error) == (500, "HTTP 500")
+    assert results["light.drop"].status is None
+    assert results["light.drop"].error
+    assert (results["light.turn_on"].status, results["light.turn_on"].error) == (200, None)
+    assert stats.sent == 3
+    assert sorted(path for path, _, _, _ in server.requests) == [
+        "/api/services/light/drop", "/api/services/light/fail", "/api/services/light/turn_on"
+    ]
+
+
+def test_failures_after_sending_are_not_retried(server, base_url):
+    pool = ConnectionPool(base_url, timeout=0.2)
+    assert pool.request("POST", "/api/services/light/turn_on", b"{}")[0] == 200
+    with pytest.raises(OSError):
+        pool.request("POST", "/api/services/light/slow", b"{}")
+    with pytest.raises(OSError):
+        pool.request("POST", "/api/services/light/drop", b"{}")
+    pool.close()
+
+    assert [path for path, _, _, _ in server.requests] == [
+        "/api/services/light/turn_on", "/api/services/light/slow", "/api/services/light/drop"
+    ]
+
+
+def test_stale_connections_are_replaced_before_sending(server, base_url):
+    server.close_after_response = True
+    pool = ConnectionPool(base_url)
+    for _ in range(3):
+        assert pool.request("POST", "/api/services/light/turn_on", b"{}")[0] == 200
+        time.sleep(0.05)
+    pool.close()
+
+    assert len(server.requests) == 3
+    assert pool.opened == 3
+
+
+def test_send_failure_on_reused_connection_is_retried(server, base_url):
+    pool = ConnectionPool(base_url)
+    assert pool.request("POST", "/api/services/light/turn_on", b"{}")[0] == 200
+    stale = pool.idle.get_nowait()
+
+    def broken_send(data):
+        raise BrokenPipeError()
+
+    stale.send = broken_send
+    pool.idle.put(stale)
+    assert pool.request("POST", "/api/services/light/turn_on", b"{}")[0] == 200
+    pool.close()
+
+    assert len(server.requests) == 2
+    assert pool.opened == 2
+
+
+def test_build_uses_service_map(tmp_path):
+    show_file = tmp_path / "show.csv"
+    show_file.write_text(
+        "Intro,audio,,0:10,,\n"
+        "fog,homeassistant,0:01,2,,\n"
+        "light.stage,homeassistant,0:03,,,\n"
+        "confetti,homeassistant,0:04,,,\n",
+        encoding="utf-8"
+    )
+    service_map = tmp_path / "services.json"
+    service_map.write_text(json.dumps({"version": 1, "effects": {"fog": {
+        "start": {"service": "switch.turn_on", "data": {"entity_id": "switch.fog"}},
+        "end": {"service": "switch.turn_off", "data": {"entity_id": "switch.fog"}},
+    }}}), encoding="utf-8")
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("file", type=Path)
+    add_build_arguments(arg_parser)
+    arg_parser.set_defaults(note_map=None, verbose=False, watch=False)
+    args = arg_parser.parse_args([
+        str(show_file), "-o", str(tmp_path / "build"), "--orchestrate", "homeassistant",
+        "--service-map", str(service_map), "--media-durations", "trust"
+    ])
+    (tmp_path / "build").mkdir()
+
+    BuildSession(args).build()
+
+    with open(tmp_path / "build" / "show.homeassistant.json", encoding="utf-8") as file:
+        schedule = json.load(file)
+    assert [(call["time"], call["service"], call["data"]) for call in schedule["calls"]] == [
+        (1.0, "switch.turn_on", {"entity_id": "switch.fog"}),
+        (3.0, "switch.turn_off", {"entity_id": "switch.fog"}),
+        (3.0, "homeassistant.turn_on", {"entity_id": "light.stage"}),
+    ]
+    assert schedule["unmapped"] == ["confetti"]
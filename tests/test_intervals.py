@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from show_orchestrator.compiler import EventTable
+from show_orchestrator.intervals import Collision, IntervalIndex, find_collisions, merge_collisions
+from show_orchestrator.models import EffectType
+
+
+def make_table(rows: list[tuple[float, float, int]], channel: int = 0) -> EventTable:
+    table = EventTable()
+    for index, (start, end, note) in enumerate(rows):
+        table.append(start, end, index, note, channel)
+    return table
+
+
+def spans(intervals) -> list[tuple[float, float]]:
+    return [(interval.start, interval.end) for interval in intervals]
+
+
+@pytest.fixture
+def index() -> IntervalIndex:
+    return IntervalIndex({
+        EffectType.LIGHTS: make_table([(0.0, 60.0, 1), (1.0, 2.0, 2), (2.0, 3.0, 2), (5.0, 5.0, 3)]),
+        EffectType.PROJECTION: make_table([(1.5, 4.0, 7)], channel=1),
+    })
+
+
+def test_active_at(index):
+    assert spans(index.active_at(1.0)) == [(0.0, 60.0), (1.0, 2.0)]
+    assert spans(index.active_at(2.0)) == [(0.0, 60.0), (1.5, 4.0), (2.0, 3.0)]
+    assert spans(index.active_at(5.0)) == [(0.0, 60.0)]
+    assert spans(index.active_at(60.0)) == []
+    assert spans(index.active_at(-1.0)) == []
+    assert [(interval.effect_type, interval.channel) for interval in index.active_at(3.5)] == [
+        (EffectType.LIGHTS, 0), (EffectType.PROJECTION, 1)
+    ]
+
+
+def test_overlapping(index):
+    assert spans(index.overlapping(2.0, 2.5)) == [(0.0, 60.0), (1.5, 4.0), (2.0, 3.0)]
+    assert spans(index.overlapping(3.0, 5.0)) == [(0.0, 60.0), (1.5, 4.0)]
+    assert spans(index.overlapping(4.5, 5.5)) == [(0.0, 60.0), (5.0, 5.0)]
+    assert spans(index.overlapping(60.0, 70.0)) == []
+    assert len(index) == 5
+
+
+def test_queries_match_linear_scan():
+    generator = random.Random(7)
+    rows = [(0.0, 600.0, 0)]
+    for _ in range(2000):
+        start = generator.uniform(0.0, 600.0)
+        rows.append((start, start + generator.choice([0.0, 0.1, 1.0, 30.0]), generator.randrange(4)))
+    index = IntervalIndex({EffectType.LIGHTS: make_table(rows)})
+    intervals = index._build()
+
+    for _ in range(200):
+        time = generator.uniform(-10.0, 640.0)
+        end = time + generator.uniform(0.0, 5.0)
+        assert index.active_at(time) == [
+            interval for interval in intervals if interval.start <= time < interval.end
+        ]
+        assert index.overlapping(time, end) == [
+            interval for interval in intervals if interval.start < end and interval.end > time
+        ]
+
+
+def test_find_collisions():
+    table = make_table([(0.0, 2.0, 1), (1.0, 1.5, 1), (1.8, 3.0, 1), (3.0, 4.0, 1), (0.5, 1.0, 2)])
+
+    collisions = find_collisions(EffectType.LIGHTS, table)
+
+    assert [(spans([first]), spans([second])) for first, second in collisions] == [
+        ([(0.0, 2.0)], [(1.0, 1.5)]),
+        ([(0.0, 2.0)], [(1.8, 3.0)]),
+    ]
+    assert all(isinstance(collision, Collision) for collision in collisions)
+    assert find_collisions(EffectType.LIGHTS, make_table([(0.0, 1.0, 1), (0.0, 1.0, 1)], channel=0))
+    assert not find_collisions(EffectType.LIGHTS, make_table([(0.0, 1.0, 1), (1.0, 2.0, 1), (0.5, 1.5, 2)]))
+
+
+def test_merge_collisions():
+    table = make_table([(1.8, 3.0, 1), (0.0, 2.0, 1), (1.0, 1.5, 1), (3.0, 4.0, 1), (0.5, 1.0, 2)])
+
+    merged = merge_collisions(table)
+
+    assert list(zip(merged.start, merged.end, merged.note, merged.effect_index)) == [
+        (0.0, 3.0, 1, 1), (3.0, 4.0, 1, 3), (0.5, 1.0, 2, 4)
+    ]
+    assert not find_collisions(EffectType.LIGHTS, merged)
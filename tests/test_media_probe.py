@@ -0,0 +1,113 @@
+import struct
+import wave
+
+import pytest
+
+from show_orchestrator import media_probe
+from show_orchestrator.media_probe import MediaInfo, MediaProbeCache, probe_media
+
+MP3_HEADER = bytes([0xFF, 0xFB, 0x90, 0x00])
+MP3_FRAME_SIZE = 144 * 128000 // 44100
+
+
+def write_wav(file_path, seconds: float, sample_rate: int = 22050, channels: int = 2) -> None:
+    with wave.open(str(file_path), "wb") as file:
+        file.setnchannels(channels)
+        file.setsampwidth(2)
+        file.setframerate(sample_rate)
+        file.writeframes(bytes(int(seconds * sample_rate) * channels * 2))
+
+
+def write_aiff(file_path, frames: int, sample_rate: int, channels: int = 1) -> None:
+    exponent = sample_rate.bit_length() - 1
+    comm = struct.pack(">hIh", channels, frames, 16) + struct.pack(
+        ">HQ", 16383 + exponent, sample_rate << (63 - exponent)
+    )
+    chunks = b"NAME" + struct.pack(">I", 3) + b"abc\0"
+    chunks += b"COMM" + struct.pack(">I", len(comm)) + comm
+    chunks += b"SSND" + struct.pack(">I", 8) + bytes(8)
+    file_path.write_bytes(b"FORM" + struct.pack(">I", 4 + len(chunks)) + b"AIFF" + chunks)
+
+
+def mp3_frame(payload: bytes = b"") -> bytes:
+    return MP3_HEADER + payload + bytes(MP3_FRAME_SIZE - 4 - len(payload))
+
+
+def test_probe_wav(tmp_path):
+    file_path = tmp_path / "song.wav"
+    write_wav(file_path, 2.5)
+
+    assert probe_media(file_path) == MediaInfo(format="wav", duration=2.5, sample_rate=22050, channels=2)
+
+
+def test_probe_aiff(tmp_path):
+    file_path = tmp_path / "song.aiff"
+    write_aiff(file_path, 44100 * 3, 44100)
+
+    assert probe_media(file_path) == MediaInfo(format="aiff", duration=3.0, sample_rate=44100, channels=1)
+
+
+def test_probe_cbr_mp3(tmp_path):
+    file_path = tmp_path / "song.mp3"
+    id3 = b"ID3\x03\x00\x00" + bytes([0, 0, 1, 0]) + bytes(128)
+    file_path.write_bytes(id3 + mp3_frame() * 100)
+
+    info = probe_media(file_path)
+
+    assert (info.format, info.sample_rate, info.channels) == ("mp3", 44100, 2)
+    assert info.duration == pytest.approx(100 * MP3_FRAME_SIZE * 8 / 128000)
+
+
+def test_probe_xing_mp3(tmp_path):
+    file_path = tmp_path / "song.mp3"
+    xing = bytes(32) + b"Xing" + struct.pack(">II", 1, 1000)
+    file_path.write_bytes(mp3_frame(xing) + mp3_frame() * 10)
+
+    info = probe_media(file_path)
+
+    assert info.duration == pytest.approx(1000 * 1152 / 44100)
+
+
+@pytest.mark.parametrize("name,data,message", [
+    ("song.ogg", b"OggS" + bytes(64), "unsupported"),
+    ("song.wav", b"RIFF", "truncated"),
+    ("song.wav", b"RIFF" + struct.pack("<I", 4) + b"WAVE", "missing fmt"),
+    ("song.mp3", bytes(64), "no MPEG audio frame"),
+])
+def test_probe_rejects_bad_files(tmp_path, name, data, message):
+    file_path = tmp_path / name
+    file_path.write_bytes(data)
+
+    with pytest.raises(ValueError, match=message):
+        probe_media(file_path)
+
+
+def test_cache_skips_unchanged_files(tmp_path, monkeypatch):
+    file_path = tmp_path / "song.wav"
+    write_wav(file_path, 1.0)
+    cache = MediaProbeCache(tmp_path)
+    first = cache.probe(file_path)
+    cache.save()
+    calls = []
+    monkeypatch.setattr(media_probe, "probe_media", lambda path: calls.append(path) or first)
+
+    reloaded = MediaProbeCache(tmp_path)
+    assert reloaded.probe(file_path) == first
+    assert (calls, reloaded.probed, reloaded.changed) == ([], 0, False)
+
+    write_wav(file_path, 2.0)
+    reloaded.probe(file_path)
+    assert calls == [file_path]
+    assert (reloaded.probed, reloaded.changed) == (1, True)
+
+
+def test_probe_all_reports_errors(tmp_path):
+    good = tmp_path / "song.wav"
+    write_wav(good, 1.0)
+    missing = tmp_path / "missing.wav"
+
+    results = MediaProbeCache().probe_all([good, missing, good])
+
+    assert list(results) == [good, missing]
+    assert results[good].duration == 1.0
+    assert isinstance(results[missing], OSError)
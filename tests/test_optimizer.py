@@ -0,0 +1,102 @@
+from array import array
+
+import mido
+import pytest
+
+from show_orchestrator.compiler import EventTable
+from show_orchestrator.generator import encode_event_table
+from show_orchestrator.optimizer import OptimizerStats, optimize_event_table, order_note_offs_first
+from show_orchestrator.smf import DEFAULT_TICKS_PER_BEAT, NOTE_OFF, NOTE_ON, bpm_to_tempo, encode_midi_file
+
+TEMPO = bpm_to_tempo(120)
+HALF_TICK = TEMPO * 1e-6 / DEFAULT_TICKS_PER_BEAT / 2
+
+
+def make_table(rows: list[tuple[float, float, int]], channel: int = 0) -> EventTable:
+    table = EventTable()
+    for index, (start, end, note) in enumerate(rows):
+        table.append(start, end, index, note, channel)
+    return table
+
+
+def rows(table: EventTable) -> list[tuple[float, float, int, int]]:
+    return list(zip(table.start, table.end, table.note, table.effect_index))
+
+
+def test_merges_overlapping_spans_on_same_note():
+    table = make_table([(0.0, 2.0, 1), (1.0, 3.0, 1), (1.5, 2.5, 1), (1.0, 1.5, 2)])
+
+    optimized, stats = optimize_event_table(table)
+
+    assert rows(optimized) == [(0.0, 3.0, 1, 0), (1.0, 1.5, 2, 3)]
+    assert stats == OptimizerStats(overlapping=2)
+    assert stats.removed_messages == 4
+
+
+def test_keeps_same_note_on_other_channel():
+    table = make_table([(0.0, 2.0, 1)])
+    table.append(1.0, 3.0, 1, 1, 1)
+
+    optimized, stats = optimize_event_table(table)
+
+    assert optimized is table
+    assert stats == OptimizerStats()
+
+
+@pytest.mark.parametrize("start,merged", [(1.25, False), (1.2, True), (1.0, True)])
+def test_retrigger_gap_boundary(start, merged):
+    table = make_table([(0.0, 1.0, 1), (start, 2.0, 1)])
+
+    optimized, stats = optimize_event_table(table, min_retrigger_gap=0.25)
+
+    if merged:
+        assert rows(optimized) == [(0.0, 2.0, 1, 0)]
+        assert stats == OptimizerStats(retriggers=1)
+    else:
+        assert optimized is table
+        assert stats == OptimizerStats()
+
+
+def test_drops_spans_shorter_than_half_a_tick():
+    table = make_table([(0.0, 0.0, 1), (1.0, 1.0 + HALF_TICK * 0.9, 1), (2.0, 2.0 + HALF_TICK * 1.1, 1), (3.0, 4.0, 1)])
+
+    optimized, stats = optimize_event_table(table, min_length=HALF_TICK)
+
+    assert [row[3] for row in rows(optimized)] == [2, 3]
+    assert stats == OptimizerStats(zero_length=2)
+
+
+def test_unsorted_input():
+    table = make_table([(3.0, 4.0, 1), (0.0, 1.0, 2), (0.5, 3.5, 1), (2.0, 5.0, 1)])
+
+    optimized, stats = optimize_event_table(table)
+
+    assert rows(optimized) == [(0.0, 1.0, 2, 1), (0.5, 5.0, 1, 2)]
+    assert stats == OptimizerStats(overlapping=2)
+
+
+def test_order_note_offs_first():
+    ticks = array('l', [0, 10, 10, 10, 20])
+    statuses = array('B', [NOTE_ON, NOTE_ON | 1, NOTE_OFF, NOTE_OFF | 1, NOTE_OFF])
+    notes = array('B', [1, 2, 1, 2, 3])
+
+    order_note_offs_first(ticks, statuses, notes, NOTE_OFF)
+
+    assert list(statuses) == [NOTE_ON, NOTE_OFF, NOTE_OFF | 1, NOTE_ON | 1, NOTE_OFF]
+    assert list(notes) == [1, 1, 2, 2, 3]
+
+
+@pytest.mark.parametrize("note_offs_first,expected", [
+    (False, ["note_on", "note_on", "note_off", "note_off"]),
+    (True, ["note_on", "note_off", "note_on", "note_off"]),
+])
+def test_encoded_note_off_before_note_on_on_same_tick(tmp_path, note_offs_first, expected):
+    table = make_table([(1.0, 2.0, 1), (0.0, 1.0, 1)])
+    track, _ = encode_event_table(table, DEFAULT_TICKS_PER_BEAT, TEMPO, note_offs_first=note_offs_first)
+    file_path = tmp_path / "song.mid"
+    file_path.write_bytes(encode_midi_file([track], DEFAULT_TICKS_PER_BEAT, 0))
+
+    messages = [message for message in mido.MidiFile(file_path).tracks[0] if not message.is_meta]
+
+    assert [message.type for message in messages] == expected
+    assert [message.time for message in messages][:3] == [0, DEFAULT_TICKS_PER_BEAT * 2, 0]
@@ -0,0 +1,87 @@
+import pytest
+
+from show_orchestrator.models import EffectType
+from show_orchestrator.parser import Parser, validate_duration_column, validate_timestamp_column
+
+
+def write_csv(tmp_path, text):
+    file_path = tmp_path / "show.csv"
+    file_path.write_text(text, encoding="utf-8")
+    return file_path
+
+
+def test_load_show_from_csv(tmp_path):
+    file_path = write_csv(tmp_path, (
+        "name,type,timestamp,duration,note,file\n"
+        "Intro,audio,,1:30,,intro.wav\n"
+        "Wash,lights,0:00,2,10,\n"
+        "Click,extra track,0:00,1:30,,click.wav\n"
+        "Wash,lights,0:05.5,0:01.5,10,\n"
+        "Logo,projection,0:10,,,\n"
+        "Finale,audio,,45.5,,\n"
+        "Wash,lights,0:01,,,\n"
+    ))
+
+    show = Parser().load_show(file_path)
+
+    intro, finale = show.audio_tracks
+    assert (intro.name, intro.duration, intro.file_path) == ("Intro", "1:30", "intro.wav")
+    assert [(event.timestamp, event.duration) for event in intro.events[EffectType.LIGHTS]] == [
+        ("0:00", 2.0), ("0:05.5", "0:01.5")
+    ]
+    assert [(event.effect_id, event.duration) for event in intro.events[EffectType.PROJECTION]] == [("Logo", None)]
+    assert [(track.name, track.duration, track.file_path) for track in intro.extra_tracks] == [
+        ("Click", "1:30", "click.wav")
+    ]
+    assert (finale.duration, finale.file_path, finale.extra_tracks) == (45.5, None, None)
+    assert [(effect.id, effect.note) for effect in show.effects[EffectType.LIGHTS]] == [("Wash", 10)]
+    assert [effect.id for effect in show.effects[EffectType.PROJECTION]] == ["Logo"]
+
+
+@pytest.mark.parametrize("timestamp,duration,message", [
+    ("0:1", "", "Line 3: Timestamp"),
+    ('"0:01\n0:02"', "", "Line 4: Timestamp"),
+    ("0:01", "fast", "Line 3: Duration"),
+    ("0:01", '"1\n2"', "Line 4: Duration"),
+])
+def test_invalid_rows_report_line(tmp_path, timestamp, duration, message):
+    file_path = write_csv(tmp_path, (
+        "Intro,audio,,10,,\n"
+        "Wash,lights,0:00,1,,\n"
+        f"Wash,lights,{timestamp},{duration},,\n"
+    ))
+
+    with pytest.raises(ValueError, match=message):
+        Parser().load_show(file_path)
+
+
+def test_audio_track_requires_duration(tmp_path):
+    file_path = write_csv(tmp_path, "Intro,audio,,,,\nWash,lights,0:00,1,,\n")
+
+    with pytest.raises(ValueError, match="Line 1: Audio track 'Intro' must have a duration"):
+        Parser().load_show(file_path)
+
+
+def test_one_effect_per_repeated_id(tmp_path):
+    file_path = write_csv(tmp_path, (
+        "Intro,audio,,10,,\n"
+        "Wash,lights,0:00,1,10,\n"
+        "Wash,lights,0:02,1,10,\n"
+        "Finale,audio,,10,,\n"
+        "Wash,lights,0:00,1,10,\n"
+        "Spot,lights,0:01,1,,\n"
+    ))
+
+    show = Parser().load_show(file_path)
+
+    assert [(effect.id, effect.note) for effect in show.effects[EffectType.LIGHTS]] == [("Wash", 10), ("Spot", None)]
+
+
+def test_column_fast_path_and_fallback():
+    assert validate_timestamp_column(["0:00", "1:02.5"], [2, 3]) == ["0:00", "1:02.5"]
+    assert validate_duration_column(["1:30", None, "2"], [1, 2, 3]) == ["1:30", None, 2.0]
+    assert validate_duration_column(["1", " 2 "], [1, 2]) == [1.0, 2.0]
+    with pytest.raises(ValueError, match="Line 3"):
+        validate_timestamp_column(["0:00", "0:01\n0:02"], [2, 3])
+    with pytest.raises(ValueError, match="Line 7"):
+        validate_duration_column(["1", "2", "1\n2"], [5, 6, 7])
@@ -0,0 +1,155 @@
+import statistics
+
+import pytest
+
+from show_orchestrator.playback import RecordingPort, ShowPlayer, StatsRecorder
+
+
+INTRO = [
+    (0.0, "note_on", 0, 10),
+    (0.5, "note_on", 0, 11),
+    (0.75, "note_off", 0, 11),
+    (1.0, "note_off", 0, 10),
+    (2.0, "note_on", 1, 12),
+    (3.5, "note_off", 1, 12),
+]
+FINALE = [
+    (4.0, "note_on", 0, 10),
+    (5.0, "note_on", 1, 12),
+    (5.5, "note_off", 1, 12),
+    (6.0, "note_off", 0, 10),
+]
+
+
+class CallbackPort(RecordingPort):
+
+    def __init__(self, clock, callback=None, latency: float = 0.0) -> None:
+        super().__init__(clock)
+        self.callback = callback
+        self.latency = latency
+
+    def send(self, message) -> None:
+        super().send(message)
+        self.clock.advance(self.latency)
+        if self.callback is not None:
+            self.callback(len(self.messages), message)
+
+
+def played(port: RecordingPort, start: float) -> list[tuple[float, str, int, int]]:
+    return [(time - start, message.type, message.channel, message.note) for time, message in port.messages]
+
+
+def assert_schedule(actual, expected, tolerance: float = 0.001) -> None:
+    assert [event[1:] for event in actual] == [event[1:] for event in expected]
+    for (actual_time, *_), (expected_time, *_) in zip(actual, expected):
+        assert expected_time <= actual_time <= expected_time + tolerance
+
+
+def test_play_sends_messages_in_order_at_event_times(compiled_show, clock):
+    port = RecordingPort(clock)
+    player = ShowPlayer(compiled_show, port, clock=clock, sleep=clock.sleep)
+    start = clock()
+    stats = player.play()
+
+    assert_schedule(played(port, start), INTRO + FINALE)
+    assert stats.sent == len(INTRO + FINALE)
+    assert player.active_notes == set()
+
+
+def test_play_stops_after_end_song(compiled_show, clock):
+    port = RecordingPort(clock)
+    player = ShowPlayer(compiled_show, port, clock=clock, sleep=clock.sleep)
+    start = clock()
+    player.play(end_song="Intro")
+
+    assert_schedule(played(port, start), INTRO)
+
+
+@pytest.mark.parametrize("song", [1, "Finale"])
+def test_seek_starts_at_song(compiled_show, clock, song):
+    port = RecordingPort(clock)
+    player = ShowPlayer(compiled_show, port, clock=clock, sleep=clock.sleep)
+    assert player.seek(song) == 4.0
+    start = clock() - 4.0
+    player.play()
+
+    assert_schedule(played(port, start), FINALE)
+
+
+@pytest.mark.parametrize("song", ["Encore", 2, -1])
+def test_seek_rejects_unknown_songs(compiled_show, clock, song):
+    player = ShowPlayer(compiled_show, RecordingPort(clock), clock=clock, sleep=clock.sleep)
+    with pytest.raises(ValueError):
+        player.seek(song)
+
+
+def test_stop_releases_active_notes(compiled_show, clock):
+    player = None
+
+    def stop_after_second_note(count, message):
+        if count == 2:
+            player.stop()
+
+    port = CallbackPort(clock, stop_after_second_note)
+    player = ShowPlayer(compiled_show, port, clock=clock, sleep=clock.sleep)
+    stats = player.play()
+
+    assert [(message.type, message.channel, message.note) for _, message in port.messages] == [
+        ("note_on", 0, 10), ("note_on", 0, 11), ("note_off", 0, 10), ("note_off", 0, 11)
+    ]
+    assert stats.sent == 2
+    assert player.active_notes == set()
+    assert 0.5 <= player.position <= 0.501
+
+
+def test_seek_during_playback_releases_active_notes(compiled_show, clock):
+    player = None
+
+    def seek_after_second_note(count, message):
+        if count == 2:
+            player.seek("Finale")
+
+    port = CallbackPort(clock, seek_after_second_note)
+    player = ShowPlayer(compiled_show, port, clock=clock, sleep=clock.sleep)
+    start = clock()
+    player.play()
+
+    messages = played(port, start)
+    assert [message[1:] for message in messages[:4]] == [
+        ("note_on", 0, 10), ("note_on", 0, 11), ("note_off", 0, 10), ("note_off", 0, 11)
+    ]
+    seek_time = messages[2][0]
+    assert_schedule(
+        [(time - seek_time, *rest) for time, *rest in messages[4:]],
+        [(time - 4.0, *rest) for time, *rest in FINALE]
+    )
+    assert player.active_notes == set()
+
+
+def test_stats_record_latency_and_lateness(compiled_show, clock):
+    port = CallbackPort(clock, latency=0.002)
+    player = ShowPlayer(compiled_show, port, clock=clock, sleep=clock.sleep)
+    stats = player.play()
+
+    assert stats.sent == len(INTRO + FINALE)
+    assert stats.mean_latency == pytest.approx(0.002)
+    assert stats.max_latency == pytest.approx(0.002)
+    assert 0.0 <= stats.mean_lateness <= stats.max_lateness <= clock.spin
+    assert stats.jitter <= clock.spin
+
+
+def test_stats_recorder_jitter_is_lateness_standard_deviation():
+    recorder = StatsRecorder()
+    latencies = [0.001, 0.003, 0.002, 0.004]
+    lateness = [0.0, 0.002, 0.010, 0.004]
+    for latency, late in zip(latencies, lateness):
+        recorder.record(latency, late)
+    stats = recorder.summary()
+
+    assert stats.sent == 4
+    assert stats.mean_latency == pytest.approx(statistics.mean(latencies))
+    assert stats.max_latency == 0.004
+    assert stats.mean_lateness == pytest.approx(statistics.mean(lateness))
+    assert stats.max_lateness == 0.010
+    assert stats.jitter == pytest.approx(statistics.pstdev(lateness))
+    assert StatsRecorder().summary().sent == 0
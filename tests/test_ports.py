@@ -0,0 +1,140 @@
+import time
+
+import mido
+import pytest
+
+from show_orchestrator.ports import PortManager, get_output_names
+
+
+class StubPort:
+
+    def __init__(self, name: str, clock) -> None:
+        self.name = name
+        self.clock = clock
+        self.messages: list[tuple[float, mido.Message]] = []
+        self.closed = False
+
+    def send(self, message: mido.Message) -> None:
+        self.messages.append((self.clock(), message))
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class StubOpener:
+
+    def __init__(self, clock) -> None:
+        self.clock = clock
+        self.opened: list[str] = []
+        self.ports: dict[str, StubPort] = {}
+
+    def __call__(self, name: str) -> StubPort:
+        self.opened.append(name)
+        if name == "broken":
+            raise OSError("no such port")
+        port = self.ports[name] = StubPort(name, self.clock)
+        return port
+
+
+def wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            pytest.fail("timed out waiting for the port manager")
+        time.sleep(0.001)
+
+
+def advance(manager: PortManager, clock, seconds: float) -> None:
+    clock.advance(seconds)
+    with manager.condition:
+        manager.condition.notify()
+
+
+@pytest.fixture
+def opener(clock) -> StubOpener:
+    return StubOpener(clock)
+
+
+@pytest.fixture
+def manager(opener, clock):
+    manager = PortManager(opener=opener, note_duration=0.25, clock=clock)
+    yield manager
+    if not manager.closed:
+        manager.close()
+
+
+def test_ports_are_opened_once_and_reused(manager, opener):
+    manager.prepare("A")
+    wait_for(lambda: opener.opened == ["A"])
+    manager.play_note("A", 60, 0)
+    manager.play_note("A", 61, 1)
+    manager.send("B", mido.Message("note_on", note=62))
+    wait_for(lambda: "B" in opener.ports and len(opener.ports["A"].messages) == 2)
+
+    assert opener.opened == ["A", "B"]
+
+
+def test_note_off_is_scheduled_note_duration_after_note_on(manager, opener, clock):
+    start = clock()
+    manager.play_note("A", 60, 3, velocity=100)
+    wait_for(lambda: "A" in opener.ports and len(opener.ports["A"].messages) == 1)
+    time.sleep(0.02)
+    port = opener.ports["A"]
+    assert [message.type for _, message in port.messages] == ["note_on"]
+    assert [(due - start, message.type) for due, _, _, message in manager.scheduled] == [(0.25, "note_off")]
+
+    advance(manager, clock, 0.2)
+    time.sleep(0.02)
+    assert len(port.messages) == 1
+    advance(manager, clock, 0.05)
+    wait_for(lambda: len(port.messages) == 2)
+
+    (on_time, note_on), (off_time, note_off) = port.messages
+    assert off_time - on_time == pytest.approx(0.25)
+    assert (note_on.type, note_on.note, note_on.channel, note_on.velocity) == ("note_on", 60, 3, 100)
+    assert (note_off.type, note_off.note, note_off.channel) == ("note_off", 60, 3)
+
+
+def test_close_flushes_pending_note_offs(manager, opener):
+    manager.play_note("A", 60, 0)
+    manager.play_note("A", 61, 0, duration=1.0)
+    wait_for(lambda: "A" in opener.ports and len(opener.ports["A"].messages) == 2)
+    manager.close()
+
+    port = opener.ports["A"]
+    assert [(message.type, message.note) for _, message in port.messages] == [
+        ("note_on", 60), ("note_on", 61), ("note_off", 60), ("note_off", 61)
+    ]
+    assert port.closed
+    assert manager.scheduled == []
+    assert manager.ports == {}
+
+
+def test_send_times_and_errors_are_recorded(manager, opener):
+    message = mido.Message("note_on", note=60)
+    manager.send("A", message)
+    manager.send("broken", message)
+    wait_for(lambda: len(manager.send_times) == 1 and len(manager.errors) == 1)
+
+    port_name, sent, seconds = manager.send_times[0]
+    assert (port_name, sent) == ("A", message)
+    assert seconds >= 0
+    port_name, error = manager.errors[0]
+    assert port_name == "broken"
+    assert isinstance(error, OSError)
+
+
+@pytest.mark.parametrize("error", [ModuleNotFoundError("No module named 'rtmidi'"), OSError("no MIDI backend")])
+def test_get_output_names_without_backend(monkeypatch, error):
+    def fail():
+        raise error
+
+    monkeypatch.setattr(mido, "get_output_names", fail)
+
+    assert get_output_names() == []
+
+
+def test_get_output_names(monkeypatch):
+    monkeypatch.setattr(mido, "get_output_names", lambda: ["Loop 1", "Loop 2"])
+
+    assert get_output_names() == ["Loop 1", "Loop 2"]
@@ -0,0 +1,64 @@
+import pytest
+
+from show_orchestrator.backends.reaper import ReaperBackend
+from show_orchestrator.layouts import COMBINED_MIDI_KEY
+from show_orchestrator.models import AudioTrack, EffectType, ExtraAudioTrack, Show
+
+pytest.importorskip("reathon")
+
+
+def build_project(tmp_path, streaming: bool) -> bytes:
+    media_dir = tmp_path / "media"
+    media_dir.mkdir(exist_ok=True)
+    for name in ("intro.wav", "click.wav", "finale.mp3", "crowd.mp3"):
+        (media_dir / name).write_bytes(b"RIFF")
+    show = Show(
+        audio_tracks=[
+            AudioTrack(
+                name="Intro",
+                duration=180.5,
+                file_path=str(media_dir / "intro.wav"),
+                events={effect_type: [] for effect_type in EffectType},
+                extra_tracks=[ExtraAudioTrack(
+                    name="Click", file_path=str(media_dir / "click.wav"), timestamp=1.5, duration=30
+                )]
+            ),
+            AudioTrack(
+                name="Finale",
+                duration=1 / 3,
+                file_path=str(media_dir / "finale.mp3"),
+                events={effect_type: [] for effect_type in EffectType},
+                extra_tracks=[ExtraAudioTrack(
+                    name="Crowd", file_path=str(media_dir / "crowd.mp3"), timestamp="0:02.25", duration="0:10"
+                )]
+            ),
+        ],
+        effects={effect_type: [] for effect_type in EffectType}
+    )
+    midi_files = {
+        "Intro": {
+            EffectType.LIGHTS: {"file_path": media_dir / "Intro_lights.mid", "duration": 179.9},
+            EffectType.PROJECTION: {"file_path": media_dir / "Intro_projection.mid", "duration": 12},
+        },
+        "Finale": {
+            EffectType.LIGHTS: {"file_path": media_dir / "Finale_lights.mid", "duration": 0.1 + 0.2},
+            COMBINED_MIDI_KEY: {"file_path": media_dir / "Finale.mid", "duration": 0.25},
+        },
+    }
+    output_dir = tmp_path / ("streaming" if streaming else "reathon")
+    output_dir.mkdir()
+    backend = ReaperBackend(streaming=streaming)
+    backend.create_project(show, midi_files, output_dir)
+    backend.save_project(output_dir / "show.rpp")
+    return (output_dir / "show.rpp").read_bytes()
+
+
+def test_streaming_writer_matches_reathon(tmp_path):
+    streamed = build_project(tmp_path, streaming=True)
+    expected = build_project(tmp_path, streaming=False)
+
+    assert streamed == expected
+    assert b'MARKER 1 180.5 "Finale" 0 0 1 B' in streamed
+    assert b'NAME "Crowd"\n<ITEM\nPOSITION 182.75\n' in streamed
+    for source_type, suffix in ((b"WAVE", b".wav"), (b"MP3", b".mp3"), (b"SECTION", b".mid")):
+        assert streamed.count(b"<SOURCE " + source_type) == streamed.count(suffix + b'"')
@@ -0,0 +1,106 @@
+import marshal
+
+import pytest
+
+from show_orchestrator.models import EffectType, Show
+from show_orchestrator.parser import Parser
+from show_orchestrator.show_cache import (
+    CACHE_MAGIC, CACHE_VERSION, HEADER, ShowCache, decode_show, encode_show, hash_source
+)
+
+SHOW = Show(**{
+    "audio_tracks": [
+        {
+            "name": "Intro",
+            "duration": "1:30",
+            "file_path": "intro.wav",
+            "extra_tracks": [{"name": "Click", "file_path": "click.wav", "duration": 90.0, "timestamp": "0:00"}],
+            "events": {
+                "lights": [
+                    {"timestamp": "0:01", "effect_id": "wash", "duration": 2.5},
+                    {"timestamp": 3.5, "effect_id": "spot"},
+                ],
+                "projection": [],
+            },
+        },
+        {"name": "Finale", "duration": 45.5, "events": {"homeassistant": [{"timestamp": "0:02", "effect_id": "fog"}]}},
+    ],
+    "effects": {
+        "lights": [{"id": "wash", "name": "Wash", "note": 10}, {"id": "spot", "name": "Spot", "channel": 2}],
+        "homeassistant": [{"id": "fog", "name": "Fog"}],
+    },
+})
+
+
+def test_encode_decode_round_trip():
+    payload = marshal.loads(marshal.dumps(encode_show(SHOW)))
+
+    show = decode_show(payload)
+
+    assert show.model_dump() == SHOW.model_dump()
+    assert isinstance(next(iter(show.effects)), EffectType)
+
+
+@pytest.fixture
+def source(tmp_path):
+    file_path = tmp_path / "show.csv"
+    file_path.write_text("Intro,audio,,10,,\nWash,lights,0:01,2,10,\n", encoding="utf-8")
+    return file_path
+
+
+def test_save_and_load(tmp_path, source):
+    cache = ShowCache(tmp_path / "build")
+    source_hash = hash_source(source)
+    cache.save(source, source_hash, SHOW)
+
+    assert cache.load(source, source_hash).model_dump() == SHOW.model_dump()
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_changed_source_hash_misses(tmp_path, source):
+    cache = ShowCache(tmp_path)
+    cache.save(source, hash_source(source), SHOW)
+    source.write_text("Intro,audio,,20,,\n", encoding="utf-8")
+
+    assert cache.load(source, hash_source(source)) is None
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+@pytest.mark.parametrize("size", [0, 3, HEADER.size, HEADER.size + 5])
+def test_truncated_cache_misses(tmp_path, source, size):
+    cache = ShowCache(tmp_path)
+    source_hash = hash_source(source)
+    cache.save(source, source_hash, SHOW)
+    cache_path = cache.get_path(source)
+    cache_path.write_bytes(cache_path.read_bytes()[:size])
+
+    assert cache.load(source, source_hash) is None
+    assert cache.misses == 1
+
+
+@pytest.mark.parametrize("payload", [
+    ((("fireworks", ()),), ()),
+    ((), (("Intro", 10.0, None, None, (("lights", ("0:01",), ("wash",)),)),)),
+    ("not a show",),
+])
+def test_bad_payload_misses(tmp_path, source, payload):
+    cache = ShowCache(tmp_path)
+    source_hash = hash_source(source)
+    cache.get_path(source).write_bytes(
+        HEADER.pack(CACHE_MAGIC, CACHE_VERSION, marshal.version, source_hash) + marshal.dumps(payload)
+    )
+
+    assert cache.load(source, source_hash) is None
+    assert cache.misses == 1
+
+
+def test_parser_reparses_after_bad_cache(tmp_path, source):
+    parser = Parser(cache_dir=tmp_path / "build")
+    first = parser.load_show(source)
+    cache_path = parser.cache.get_path(source)
+    cache_path.write_bytes(cache_path.read_bytes()[:HEADER.size] + marshal.dumps(((("fireworks", ()),), ())))
+
+    second = Parser(cache_dir=tmp_path / "build").load_show(source)
+
+    assert second.model_dump() == first.model_dump()
+    assert Parser(cache_dir=tmp_path / "build").load_show(source).model_dump() == first.model_dump()
@@ -0,0 +1,108 @@
+from array import array
+
+import mido
+import pytest
+
+from show_orchestrator.smf import (
+    DEFAULT_TICKS_PER_BEAT, DEFAULT_VELOCITY, END_OF_TRACK, NOTE_OFF, NOTE_ON, bpm_to_tempo, encode_track,
+    encode_variable_int, seconds_to_ticks, write_midi_file
+)
+
+
+TEMPO = bpm_to_tempo(120)
+TICK_SECONDS = TEMPO * 1e-6 / DEFAULT_TICKS_PER_BEAT
+
+
+def decode(file_path):
+    midi_file = mido.MidiFile(file_path)
+    tracks = []
+    for track in midi_file.tracks:
+        messages = []
+        tick = 0
+        for message in track:
+            tick += message.time
+            messages.append((tick, message))
+        tracks.append(messages)
+    return midi_file, tracks
+
+
+def encode_events(events):
+    times = array('d', [time for time, _, _, _ in events])
+    statuses = array('B', [(NOTE_ON if kind == "note_on" else NOTE_OFF) | channel for _, kind, channel, _ in events])
+    notes = array('B', [note for _, _, _, note in events])
+    return encode_track(seconds_to_ticks(times, DEFAULT_TICKS_PER_BEAT, TEMPO), statuses, notes)
+
+
+EVENTS = [
+    (0.0, "note_on", 0, 60),
+    (0.1, "note_off", 0, 60),
+    (0.1, "note_on", 0, 62),
+    (0.25, "note_on", 1, 40),
+    (3.0, "note_off", 0, 62),
+    (200.0, "note_off", 1, 40),
+]
+
+
+@pytest.mark.parametrize("value,encoded", [
+    (0, b"\x00"), (0x7f, b"\x7f"), (0x80, b"\x81\x00"), (0x3fff, b"\xff\x7f"), (0x4000, b"\x81\x80\x00"),
+])
+def test_encode_variable_int(value, encoded):
+    assert encode_variable_int(value) == encoded
+
+
+def test_seconds_to_ticks_rounds_to_nearest_tick():
+    seconds = array('d', [0.0, 0.5, 1.0004, 1.0006, 123.456])
+    assert list(seconds_to_ticks(seconds, DEFAULT_TICKS_PER_BEAT, TEMPO)) == [
+        round(second / TICK_SECONDS) for second in seconds
+    ]
+
+
+def test_encode_track_matches_mido(tmp_path):
+    file_path = tmp_path / "track.mid"
+    write_midi_file(file_path, [encode_events(EVENTS)])
+    midi_file, (messages,) = decode(file_path)
+
+    assert midi_file.type == 0
+    assert midi_file.ticks_per_beat == DEFAULT_TICKS_PER_BEAT
+    assert messages[-1][1].type == "end_of_track"
+    assert [
+        (tick, message.type, message.channel, message.note, message.velocity) for tick, message in messages[:-1]
+    ] == [
+        (round(time / TICK_SECONDS), kind, channel, note, DEFAULT_VELOCITY) for time, kind, channel, note in EVENTS
+    ]
+
+
+def test_encode_track_uses_running_status_and_multibyte_deltas():
+    track = encode_events([
+        (0.0, "note_on", 0, 60),
+        (0.0, "note_on", 0, 61),
+        (0.5, "note_off", 0, 60),
+        (0.5, "note_off", 0, 61),
+        (0.5, "note_on", 1, 62),
+    ])
+    half_second = encode_variable_int(round(0.5 / TICK_SECONDS))
+    assert len(half_second) == 2
+    assert track == (
+        bytes([0, NOTE_ON, 60, DEFAULT_VELOCITY])
+        + bytes([0, 61, DEFAULT_VELOCITY])
+        + half_second + bytes([NOTE_OFF, 60, DEFAULT_VELOCITY])
+        + bytes([0, 61, DEFAULT_VELOCITY])
+        + bytes([0, NOTE_ON | 1, 62, DEFAULT_VELOCITY])
+        + END_OF_TRACK
+    )
+
+
+def test_type_1_file_keeps_tracks_separate(tmp_path):
+    file_path = tmp_path / "show.mid"
+    first = EVENTS[:3]
+    second = [(0.5, "note_on", 2, 10), (0.75, "note_off", 2, 10)]
+    write_midi_file(file_path, [encode_events(first), encode_events(second)], midi_type=1)
+    midi_file, tracks = decode(file_path)
+
+    assert midi_file.type == 1
+    assert len(tracks) == 2
+    for events, messages in zip((first, second), tracks):
+        assert messages[-1][1].type == "end_of_track"
+        assert [(tick, message.type, message.channel, message.note) for tick, message in messages[:-1]] == [
+            (round(time / TICK_SECONDS), kind, channel, note) for time, kind, channel, note in events
+        ]